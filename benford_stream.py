@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""benford_stream.py"""
+
+# This code runs the Benford's Law digit analysis of benfords_law.py on real data 
+# sets: a numeric column of a CSV file, or a binary file of floating point numbers. 
+# Files are read chunk by chunk, so they can be much larger than memory, and the 
+# chunks are counted in parallel and merged at the end. 
+# Code is aided by the following online resources: 
+# https://en.wikipedia.org/wiki/Benford%27s_law#Generalization_to_digits_beyond_the_first
+# https://numpy.org/doc/stable/reference/generated/numpy.memmap.html
+# https://docs.python.org/3/library/concurrent.futures.html
+
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Used to read CSV files and the command line
+import csv
+import os
+import sys
+import tempfile
+# Used to count the chunks on several processes
+from concurrent.futures import ProcessPoolExecutor
+# Used to read the digits of values too large or small for the exact boundary check
+from decimal import Decimal
+# Provides functions for creating plots
+import matplotlib.pyplot as plt
+# Import allows us to count digits of whole chunks of numbers at once
+import numpy as np 
+# Expected probabilities, conformity statistics and the MSD bar plot
+from benfords_law import Conformity, benford_probabilities, conformity, plot
+# if the script is type checking
+if typing.TYPE_CHECKING: 
+    # Allows us to use arrays
+    from numpy.typing import NDArray 
+
+# Numbers counted at a time, this bounds the memory each process uses
+CHUNK_SIZE: int = 1 << 20
+
+class DigitCounts(typing.NamedTuple):
+    """Running digit counts, each array is indexed by the digit(s) themselves"""
+    # Counts of the first digit 1 to 9 (index 0 is unused)
+    first: NDArray[np.int64]
+    # Counts of the second digit 0 to 9
+    second: NDArray[np.int64]
+    # Counts of the first two digits 10 to 99 (indexes 0 to 9 are unused)
+    first_two: NDArray[np.int64]
+
+    @property
+    def total(self)-> int: 
+        """Number of values counted"""
+        return int(self.first.sum())
+
+def empty_counts()-> DigitCounts: 
+    """Counts before any values have been read"""
+    return DigitCounts(np.zeros(10, dtype=np.int64), np.zeros(10, dtype=np.int64), 
+                       np.zeros(100, dtype=np.int64))
+
+def merge_counts(a:DigitCounts, b:DigitCounts)-> DigitCounts: 
+    """Adds two sets of counts together"""
+    return DigitCounts(a.first + b.first, a.second + b.second, a.first_two + b.first_two)
+
+def digit_counts(values:NDArray[np.float64])-> DigitCounts: 
+    """Counts the leading digits of a chunk of numbers"""
+    values = np.abs(np.asarray(values, dtype=np.float64))
+    # Zeros, NaNs and infinities have no leading digits
+    values = values[np.isfinite(values) & (values > 0)]
+    # Scale every value into [10, 100): the integer part is its first two digits
+    log_values: NDArray[np.float64] = np.log10(values)
+    mantissa: NDArray[np.float64] = 10**(log_values % 1 + 1)
+    first_two: NDArray[np.int64] = np.clip(np.floor(mantissa).astype(np.int64), 10, 99)
+    # Rounding decides the digits of values right at a digit boundary, like 5.0, 0.3
+    # or 110, which are common in real data. For those, compare the value exactly
+    # with the nearest float to the boundary k * 10^e
+    boundary: NDArray[np.float64] = np.round(mantissa)
+    # Subnormal numbers carry too few bits for the mantissa, so check them too
+    close: NDArray[np.intp] = np.flatnonzero(
+        (np.abs(mantissa - boundary) < 1e-9 * boundary) | (values < np.finfo(np.float64).tiny))
+    if close.size:
+        k: NDArray[np.float64] = boundary[close]
+        exponent: NDArray[np.float64] = np.floor(log_values[close]) - 1
+        # Powers of 10 up to 10^22 are exact floats, so one multiplication or
+        # division gives the correctly rounded boundary
+        exact: NDArray[np.bool_] = np.abs(exponent) <= 22
+        power: NDArray[np.float64] = 10.0**np.abs(np.where(exact, exponent, 0))
+        above: NDArray[np.bool_] = values[close] >= np.where(exponent >= 0, k * power, k / power)
+        digits: NDArray[np.int64] = np.where(above, k, k - 1).astype(np.int64)
+        # Just above 100 * 10^e a value starts 10, just below 10 * 10^e it starts 99
+        digits[digits == 100] = 10
+        digits[digits == 9] = 99
+        first_two[close[exact]] = digits[exact]
+        # Very large or small values: read the digits of the shortest decimal form
+        for i in close[~exact].tolist():
+            decimal_digits: tuple[int, ...] = Decimal(repr(float(values[i]))).as_tuple().digits
+            first_two[i] = 10 * decimal_digits[0] + (decimal_digits[1] if len(decimal_digits) > 1 else 0)
+    return DigitCounts(np.bincount(first_two // 10, minlength=10), 
+                       np.bincount(first_two % 10, minlength=10), 
+                       np.bincount(first_two, minlength=100))
+
+def expected_second_digit()-> NDArray[np.float64]: 
+    """Expected probability of each second digit 0 to 9"""
+    # Add up P(first two digits) over all the first digits 
+    first_two: NDArray[np.float64] = expected_first_two().reshape(10, 10)
+    return first_two.sum(axis=0)
+
+def expected_first_two()-> NDArray[np.float64]: 
+    """Expected probability of the first two digits 10 to 99 (0 for indexes below 10)"""
+    p: NDArray[np.float64] = np.zeros(100)
+    p[10:] = np.log10(1 + 1/np.arange(10, 100))
+    return p
+
+# ---------------------------------------------------------------------------
+# Binary files
+# ---------------------------------------------------------------------------
+
+def binary_chunk_counts(file_name:str, dtype:str, start:int, stop:int)-> DigitCounts: 
+    """Counts the digits of elements start to stop of a binary file"""
+    # Every process maps the file itself, so no data is sent between processes 
+    values: NDArray[np.float64] = np.memmap(file_name, dtype=dtype, mode="r")
+    return digit_counts(values[start:stop])
+
+def analyze_binary(file_name:str, dtype:str="<f8", chunk_size:int=CHUNK_SIZE, 
+                   num_workers:int|None=None)-> DigitCounts: 
+    """Counts the digits of every number in a binary file of floats"""
+    num_values: int = os.path.getsize(file_name) // np.dtype(dtype).itemsize
+    starts: list[int] = list(range(0, num_values, chunk_size))
+    counts: DigitCounts = empty_counts()
+    with ProcessPoolExecutor(num_workers) as pool: 
+        for chunk in pool.map(binary_chunk_counts, [file_name]*len(starts), 
+                              [dtype]*len(starts), starts, 
+                              [start + chunk_size for start in starts]): 
+            counts = merge_counts(counts, chunk)
+    return counts
+
+# ---------------------------------------------------------------------------
+# CSV files
+# ---------------------------------------------------------------------------
+# The file is cut into byte ranges, one per task. A task reads the lines that 
+# start inside its range (the line running over the end of the range belongs 
+# to it, the partial line at its start belongs to the task before it).
+
+def csv_range_counts(file_name:str, start:int, stop:int, column:int, 
+                     delimiter:str, chunk_size:int)-> DigitCounts: 
+    """Counts the digits in one column of the lines starting in [start, stop)"""
+    counts: DigitCounts = empty_counts()
+    values: list[float] = []
+    separator: bytes = delimiter.encode()
+    with open(file_name, "rb") as file: 
+        # Move to the first line that starts at or after start
+        if start > 0: 
+            file.seek(start - 1)
+            file.readline()
+        while file.tell() < stop: 
+            line: bytes = file.readline()
+            if not line: 
+                break
+            # Skip short lines and fields that are not numbers
+            try: 
+                values.append(float(line.split(separator)[column].strip(b' "')))
+            except (IndexError, ValueError): 
+                continue
+            if len(values) == chunk_size: 
+                counts = merge_counts(counts, digit_counts(np.array(values)))
+                values = []
+    return merge_counts(counts, digit_counts(np.array(values)))
+
+def analyze_csv(file_name:str, column:int|str=0, delimiter:str=",", header:bool=True, 
+                chunk_size:int=CHUNK_SIZE, num_workers:int|None=None)-> DigitCounts: 
+    """Counts the digits of every number in one column of a CSV file. 
+    The column is its index, or its name when the file has a header line."""
+    first_byte: int = 0
+    with open(file_name, "rb") as file: 
+        if header: 
+            names: list[str] = next(csv.reader([file.readline().decode()], delimiter=delimiter))
+            if isinstance(column, str): 
+                column = [name.strip() for name in names].index(column)
+            first_byte = file.tell()
+    if isinstance(column, str): 
+        raise ValueError("A column name needs a header line")
+
+    # A few ranges per process keeps them all busy until the end
+    num_tasks: int = 4*(num_workers or os.cpu_count() or 1)
+    size: int = os.path.getsize(file_name) - first_byte
+    bounds: list[int] = [first_byte + size*i//num_tasks for i in range(num_tasks + 1)]
+    counts: DigitCounts = empty_counts()
+    with ProcessPoolExecutor(num_workers) as pool: 
+        for chunk in pool.map(csv_range_counts, [file_name]*num_tasks, bounds[:-1], 
+                              bounds[1:], [column]*num_tasks, [delimiter]*num_tasks, 
+                              [chunk_size]*num_tasks): 
+            counts = merge_counts(counts, chunk)
+    return counts
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def report(counts:DigitCounts)-> dict[str, Conformity]: 
+    """Conformity statistics of the first, second and first-two digits"""
+    total: int = counts.total
+    if total == 0: 
+        raise ValueError("No numbers with leading digits were found")
+    return {
+        "first": conformity(counts.first[1:]/total, total), 
+        "second": conformity(counts.second/total, total, expected_second_digit()), 
+        "first_two": conformity(counts.first_two[10:]/total, total, expected_first_two()[10:]), 
+    }
+
+def print_report(counts:DigitCounts)-> None: 
+    """Print the digit probabilities and the conformity statistics"""
+    print(f"Numbers counted: {counts.total:,}")
+    print("MSD probabilities:", np.round(counts.first[1:]/counts.total, 4))
+    print("Benford's Law    :", np.round(benford_probabilities(), 4))
+    for digits, stats in report(counts).items(): 
+        print(f"{digits:>9} digit(s)  Chi-square: {stats.chi_square:12.3f}  MAD: {stats.mad:.6f}")
+
+def analyze(file_name:str, column:int|str=0)-> None: 
+    """Analyze a CSV file column or a binary file of float64 values and plot the MSDs"""
+    counts: DigitCounts
+    if file_name.lower().endswith(".csv"): 
+        counts = analyze_csv(file_name, column)
+    else: 
+        counts = analyze_binary(file_name)
+    print_report(counts)
+    # Same bar plot as benfords_law.py, from the counted probabilities
+    plt.figure (file_name)
+    plot (plt.axes(), counts.first[1:]/counts.total)
+    plt.show()
+
+def main()-> None: 
+    """Define an entry point for the function"""
+    # "benford_stream.py file [column]" analyzes the given file 
+    if len(sys.argv) > 1: 
+        column: int|str = sys.argv[2] if len(sys.argv) > 2 else 0
+        analyze(sys.argv[1], int(column) if str(column).isdigit() else column)
+        return
+    # Otherwise analyze a demo file of log-normal values, which follow Benford's Law
+    with tempfile.TemporaryDirectory() as folder: 
+        file_name: str = os.path.join(folder, "lognormal.f64")
+        np.random.default_rng(2016).lognormal(0, 5, size=5_000_000).tofile(file_name)
+        analyze(file_name)
+
+if __name__== "__main__": 
+    # Call the main function
+    main()
@@ -18,8 +18,6 @@ import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator 
 # Import allows us to use arrays (so we can perform calculations on lists of numbers)
 import numpy as np 
-# Used for generating random numbers
-import random 
 # if the script is type checking
 if typing.TYPE_CHECKING: 
     # Allows us to use Axes as a variable type
@@ -27,40 +25,78 @@ if typing.TYPE_CHECKING:
     # Allows us to use arrays
     from numpy.typing import NDArray 
 
-def p_MSD()->NDArray[np.float_]:
+# Number of random numbers drawn at a time, this bounds the memory p_MSD uses
+BATCH_SIZE: int = 1_000_000
+
+class Conformity(typing.NamedTuple):
+    """How closely a digit distribution follows Benford's Law"""
+    # Pearson's chi-square statistic (8 degrees of freedom for the first digit)
+    chi_square: float
+    # Mean absolute deviation between the observed and expected probabilities
+    mad: float
+
+def benford_probabilities()->NDArray[np.float64]:
+    """Expected probability of each most significant digit 1 to 9"""
+    # P(d) = log10(1 + 1/d)
+    return np.log10(1 + 1/np.arange(1, 10))
+
+def leading_digits(n:NDArray[np.int64], power:int)->NDArray[np.int64]:
+    """Most significant digit of every n**power, found with logarithms"""
+    # n**power = 10**(power*log10(n)), and only the fractional part of the 
+    # exponent decides the leading digit: MSD = floor(10**frac(power*log10(n)))
+    mantissa: NDArray[np.float64] = 10**((power*np.log10(n)) % 1)
+    digits: NDArray[np.int64] = np.clip(np.floor(mantissa).astype(np.int64), 1, 9)
+    # Rounding can only matter right next to a digit boundary, 
+    # so those few numbers are checked with exact integer arithmetic
+    close: NDArray[np.intp] = np.flatnonzero(np.abs(mantissa - np.round(mantissa)) < 1e-9)
+    for i in close.tolist(): 
+        digits[i] = int(str(int(n[i])**power)[0])
+    return digits
+
+def p_MSD(num_samples:int=100_000, seed:int|None=None, power:int=100)->NDArray[np.float64]:
     """Calculate the most significant digit in accordance with Benford's Law"""
     # p= array of probabilities 
     # p is initialized to an array of zeros, 
     # eventually we will store the count of each MSD
-    p: NDArray[np.float_]= np.zeros (10, dtype=np.float_)
-    # 100,000 very large random numbers
-    # _ because we don't care what the actual number is
-    for _ in range (100_000):
-        # random integer
+    p: NDArray[np.float64]= np.zeros (10, dtype=np.float64)
+    # Seeded random number generator so runs can be repeated 
+    rng: np.random.Generator = np.random.default_rng(seed)
+    # very large random numbers, drawn in batches 
+    for start in range (0, num_samples, BATCH_SIZE):
+        # random integers
         # chosen from a uniform distribution 
         # between 1 and 1,000,000 (inclusive, inclusive)
-        # and then raised to the 100th power
-        n: int = random.randint (1,1_000_000)**100
-        # Convert the random number n to a string
-        # Get the element at the first index in the string(MSD)retrieved as a character 
-        # Convert the element back into an integer 
-        # Increase the count in p that corresponds to that integer
-        p[int(str(n)[0])]+=1
+        # which are then raised to the 100th power
+        n: NDArray[np.int64] = rng.integers(1, 1_000_000, size=min(BATCH_SIZE, num_samples-start), endpoint=True)
+        # Increase the count in p that corresponds to the MSD of each n**power
+        p += np.bincount(leading_digits(n, power), minlength=10)
     # Remove first element of p because Benford's Law does not include 0
     p = p[1:]
     # Get the probability of each element occurring by dividing by the 
     # total amount of large numbers
-    p = p/100_000
+    p = p/num_samples
     # MSD returns p array 
     return p 
 
-def plot (ax:Axes)-> None: 
-    """Plot the histogram"""
+def conformity(p:NDArray[np.float64], num_samples:int, 
+               expected:NDArray[np.float64]|None=None)->Conformity:
+    """Compare observed MSD probabilities with Benford's Law 
+    (or with other expected probabilities, such as for the second digit)"""
+    if expected is None: 
+        expected = benford_probabilities()
+    chi_square: float = float(num_samples*np.sum((p - expected)**2/expected))
+    mad: float = float(np.mean(np.abs(p - expected)))
+    return Conformity(chi_square, mad)
+
+def plot (ax:Axes, p:NDArray[np.float64]|None=None)-> None: 
+    """Plot the histogram of MSD probabilities p (drawn with p_MSD if not given)"""
     # Create a bar plot 
     # Digits occur between 1 and 9 
     # zorder=2.5 allows higher bars to appear on top of lower value bars 
         # Essentially the order the bars appear in 
-    plt.bar(range(1,10), p_MSD(), zorder=2.5)
+    if p is None: 
+        p = p_MSD()
+    plt.bar(range(1,10), p, zorder=2.5)
     # Plot with grid lines
     plt.grid()
     # Set the plot title
@@ -76,8 +112,13 @@ def main()-> None:
     """Define an entry point for the function"""
     # Create a new figure and set its name to the current code's filename
     plt.figure (__file__)
+    # Draw the MSD probabilities and compare them with Benford's Law
+    num_samples: int = 100_000
+    p: NDArray[np.float64] = p_MSD(num_samples, seed=2016)
+    stats: Conformity = conformity(p, num_samples)
+    print(f"Chi-square: {stats.chi_square:.3f}  MAD: {stats.mad:.6f}")
     # Call the plot function and pass through plt.axes()
-    plot (plt.axes())
+    plot (plt.axes(), p)
     # Show the plot
     plt.show()
 if __name__== "__main__": 
@@ -6,30 +6,173 @@
 # For a board square, a zero (0) indicates the square is open, 
 # a 1 represents an X and a 2 represents an O
 
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Import allows us to encode and decode whole batches of boards as arrays
+import numpy as np
+# Used to build the table of every board only once
+from functools import lru_cache
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import DTypeLike, NDArray
+
+# Number of squares on a Tic-Tac-Toe board
+BOARD_SIZE: int = 9
+
+
+def digit_weights(base: int, width: int) -> NDArray[np.int64]:
+    """Returns the place value of every digit, least significant digit first"""
+    # The largest number must still fit in a signed 64 bit integer
+    if base < 2 or width * np.log2(base) >= 63:
+        raise ValueError(f"Cannot encode {width} digits of base {base} in 64 bits")
+    return base ** np.arange(width, dtype=np.int64)
+
+
+def encode_boards(digits: NDArray[np.integer], base: int = 3) -> NDArray[np.int64]:
+    """Converts an (N, width) array of digits into N integers"""
+    digits = np.asarray(digits, dtype=np.int64)
+    if digits.size and (digits.min() < 0 or digits.max() >= base):
+        raise ValueError(f"Every digit must be between 0 and {base - 1}")
+    # Digit 0 is the least significant, the same order convert_to_ternary uses
+    return digits @ digit_weights(base, digits.shape[-1])
+
+
+def decode_boards(numbers: NDArray[np.integer], base: int = 3,
+                  width: int = BOARD_SIZE) -> NDArray[np.uint8]:
+    """Converts N integers into an (N, width) array of their digits"""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    weights: NDArray[np.int64] = digit_weights(base, width)
+    if numbers.size and (numbers.min() < 0 or numbers.max() >= weights[-1] * base):
+        raise ValueError(f"Every number must be between 0 and {base ** width - 1}")
+    # Shift every number down to each digit and keep only that digit
+    return ((numbers[..., None] // weights) % base).astype(np.uint8)
 
 
 def convert_to_ternary (number: int) -> list[int]:
     """Define a function that will convert a given integer into a list corresponding 
     to its ternary values."""
-
-    # Sets ternary equal to an empty list 
-    ternary: list[int] = []
-    
     # To convert an integer into ternary: divide the integer by 3 and store 
-    # the remainders of 2, 1, or 0 in a list. 
-    # Repeat until you get a quotient of 0 and/or 
-    # a list with length = 9 (length of a Tic-Tac-Toe board). 
+    # the remainders of 2, 1, or 0 in a list (this is what decode_boards does 
+    # for a whole array at once). The list always has length = 9 (length of a 
+    # Tic-Tac-Toe board), so numbers with more than nine trits are rejected. 
     # No need to reverse the order, since that is already part of the encoding scheme. 
-    while number > 0:
-        remainder: int = number % 3
-        if remainder == 1 or remainder == 0 or remainder==2:
-            ternary.append(remainder)
-        number = number // 3
-    while len(ternary)<9: 
-        if number ==0: 
-            ternary.append(number)
-    # Returns the conversion
-    return ternary
+    return decode_boards(np.array([number]))[0].tolist()
+
+
+# ---------------------------------------------------------------------------
+# Packed storage
+# ---------------------------------------------------------------------------
+# Every board is stored as its encoded integer in the smallest unsigned type
+# that can hold it. All 3^9 = 19,683 Tic-Tac-Toe boards fit into a uint16, so a
+# file of boards takes 2 bytes per board and can be memory-mapped from disk.
+
+
+def packed_dtype(base: int = 3, width: int = BOARD_SIZE) -> DTypeLike:
+    """Returns the smallest unsigned integer type that holds every encoding"""
+    largest: int = base ** width - 1
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if largest <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"Cannot pack {width} digits of base {base}")
+
+
+def pack_boards(digits: NDArray[np.integer], base: int = 3) -> NDArray[np.unsignedinteger]:
+    """Encodes an (N, width) array of digits into the packed storage type"""
+    digits = np.asarray(digits)
+    return encode_boards(digits, base).astype(packed_dtype(base, digits.shape[-1]))
+
+
+def save_packed(file_name: str, digits: NDArray[np.integer], base: int = 3) -> None:
+    """Writes boards to a .npy file in packed form"""
+    np.save(file_name, pack_boards(digits, base))
+
+
+def load_packed(file_name: str, mmap: bool = True) -> NDArray[np.unsignedinteger]:
+    """Reads packed boards from a .npy file, memory-mapped (read only) by default"""
+    return np.load(file_name, mmap_mode="r" if mmap else None)
+
+
+# ---------------------------------------------------------------------------
+# Position index
+# ---------------------------------------------------------------------------
+# Every Tic-Tac-Toe board has an encoding between 0 and 3^9 - 1, so tables with
+# one entry per encoding answer questions about a board with a single array
+# lookup. Boards that are rotations or reflections of each other are the same
+# position, and the smallest encoding among the 8 is used to represent them all.
+
+
+class BoardIndex(typing.NamedTuple):
+    """Lookup tables with one entry for each of the 3^9 board encodings"""
+    # True if the board can be reached in a game where X (1) moves first
+    legal: NDArray[np.bool_]
+    # Smallest encoding among the 8 rotations and reflections of the board
+    canonical: NDArray[np.uint16]
+
+
+def symmetries() -> NDArray[np.intp]:
+    """Returns an (8, 9) array; row s lists which square of the original board
+    lands on each square after applying symmetry s"""
+    square: NDArray[np.intp] = np.arange(BOARD_SIZE).reshape(3, 3)
+    # The 4 rotations, then the 4 rotations of the mirror image
+    return np.array([np.rot90(grid, turns).ravel()
+                     for grid in (square, np.fliplr(square)) for turns in range(4)])
+
+
+def winning_lines() -> NDArray[np.intp]:
+    """Returns an (8, 3) array of the squares in every row, column and diagonal"""
+    square: NDArray[np.intp] = np.arange(BOARD_SIZE).reshape(3, 3)
+    return np.vstack([square, square.T,
+                      np.diagonal(square), np.diagonal(np.fliplr(square))])
+
+
+@lru_cache(maxsize=None)
+def board_index() -> BoardIndex:
+    """Builds the legality and canonical form tables for all 3^9 encodings"""
+    numbers: NDArray[np.int64] = np.arange(3 ** BOARD_SIZE, dtype=np.int64)
+    boards: NDArray[np.uint8] = decode_boards(numbers)
+
+    # A board is legal when X has made as many moves as O or one more, at most
+    # one player has three in a row, and the winner made the last move
+    x_count: NDArray[np.int_] = np.count_nonzero(boards == 1, axis=1)
+    o_count: NDArray[np.int_] = np.count_nonzero(boards == 2, axis=1)
+    cells: NDArray[np.uint8] = boards[:, winning_lines()]
+    x_wins: NDArray[np.bool_] = (cells == 1).all(axis=2).any(axis=1)
+    o_wins: NDArray[np.bool_] = (cells == 2).all(axis=2).any(axis=1)
+    legal: NDArray[np.bool_] = (
+        ((x_count == o_count) | (x_count == o_count + 1))
+        & ~(x_wins & o_wins)
+        & (~x_wins | (x_count == o_count + 1))
+        & (~o_wins | (x_count == o_count))
+    )
+
+    # Encode all 8 images of every board and keep the smallest
+    images: NDArray[np.int64] = encode_boards(boards[:, symmetries()])
+    canonical: NDArray[np.uint16] = images.min(axis=1).astype(np.uint16)
+
+    # The tables are shared through the cache, so nobody may change them
+    legal.setflags(write=False)
+    canonical.setflags(write=False)
+    return BoardIndex(legal, canonical)
+
+
+def is_legal(numbers: NDArray[np.integer]) -> NDArray[np.bool_]:
+    """Returns True for every encoding that is a reachable board"""
+    return board_index().legal[numbers]
+
+
+def canonical_board(numbers: NDArray[np.integer]) -> NDArray[np.uint16]:
+    """Returns the canonical encoding of every board"""
+    return board_index().canonical[numbers]
+
+
+def canonical_positions() -> NDArray[np.uint16]:
+    """Returns the sorted canonical encodings of all legal positions"""
+    index: BoardIndex = board_index()
+    return np.unique(index.canonical[index.legal])
 
 
 def main() -> None: 
@@ -62,7 +205,11 @@ def main() -> None:
     print(f"The ternary version of {number} is: {ternary}")
     print (f"{ternary [0], ternary [1], ternary [2]}\n{ternary [3], ternary [4], ternary [5]}\n{ternary [6], ternary [7], ternary [8]}")
     print ()
-   
+
+    # Look up the position the board belongs to in the position index
+    print(f"Canonical encoding of {number} is: {canonical_board(np.array([number]))[0]}")
+    print(f"Legal boards: {np.count_nonzero(board_index().legal):,}")
+    print(f"Positions up to rotation and reflection: {canonical_positions().size:,}")
 
 if __name__ == "__main__":
     # Calls the main function 
@@ -11,159 +11,539 @@
 # https://www.geeksforgeeks.org/python-test-if-all-elements-are-present-in-list/
 # Code for check_winner was aided by: https://openai.com/blog/chatgpt.
 
+# The bitboard engine follows the layout described in:
+# https://github.com/denkspuren/BitboardC4/blob/master/BitboardDesign.md
+
 
 # fmt: off
 
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Import allows us to score whole batches of boards as arrays
+import numpy as np
+# Used to build each table of winning lines only once per board geometry
+from functools import lru_cache
+# Used to give the solver a time budget and to measure its speed
+from time import perf_counter
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+
+# Dimensions of a standard connect four board
+ROWS: int = 6
+COLS: int = 7
+
+
+# ---------------------------------------------------------------------------
+# Bitboard engine
+# ---------------------------------------------------------------------------
+# Each player's discs are stored as the bits of one integer. Every column uses
+# (rows + 1) bits, counted from the bottom row upwards, and the extra bit on top
+# of each column is always 0 so that runs can never wrap from one column into
+# the next. For a 6x7 board the bit numbers look like this:
+#
+#    5 12 19 26 33 40 47      <- top row of the list-of-lists board
+#    4 11 18 25 32 39 46
+#    3 10 17 24 31 38 45
+#    2  9 16 23 30 37 44
+#    1  8 15 22 29 36 43
+#    0  7 14 21 28 35 42      <- bottom row of the list-of-lists board
+#
+# Moving one square in a direction is then a fixed shift of the bit number:
+# 1 for vertical, rows + 1 for horizontal and rows or rows + 2 for the diagonals.
+
+
+def direction_shifts(rows: int = ROWS) -> dict[str, tuple[int, ...]]:
+    """Returns the bit shifts that move one square along each line direction"""
+    return {
+        "horizontal": (rows + 1,),
+        "vertical": (1,),
+        "diagonals": (rows + 2, rows),
+    }
+
+
+def bit_index(row: int, col: int, rows: int = ROWS) -> int:
+    """Returns the bit number of the square at (row, col), where row 0 is the top"""
+    return col * (rows + 1) + (rows - 1 - row)
+
+
+def to_bitboards(board: list[list[int]]) -> tuple[int, int]:
+    """Packs a list-of-lists board into one bitboard per player"""
+    rows: int = len(board)
+    # Bitboards for player 1 and player 2
+    bitboards: list[int] = [0, 0]
+    for row, line in enumerate(board):
+        for col, player in enumerate(line):
+            # Empty squares (0) are not stored on either bitboard
+            if player:
+                bitboards[player - 1] |= 1 << bit_index(row, col, rows)
+    return bitboards[0], bitboards[1]
+
+
+def has_four(bitboard: int, shifts: tuple[int, ...]) -> bool:
+    """Returns True if the bitboard has four discs in a row along any shift"""
+    for shift in shifts:
+        # Keep only the discs that have a neighbour one step along the line
+        pairs: int = bitboard & (bitboard >> shift)
+        # Two overlapping pairs two steps apart make four in a row
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
 
-def check_winner(board: list[list[int]]) -> int:
-    """Defines the function to check the winner of the connect four game as 
-    a function of the list 'board'"""
-    # Initialize the no_winner output as equal to 0
-    no_winner: int = 0
-    
-    # Create the winner variable and initialize it at 0
-    winner: int = 0
-    
-    # Run the check_horizontal function and set the output equal to its result.
-    winner = check_horizontal(board)
-    
-    # If winner does not equal 0
-    if winner:
-        # Return the player number of the winner of the game.
-        return winner
-    # Runs the check_vertical code for the list 'board' and 
-    # sets output equal to its result.
-    winner = check_vertical(board)
-    
-    # If winner does not equal 0
-    if winner:
-        # Return the player number of the winner of the game.
-        return winner
-    # Runs the check_diagonals code for the list 'board' and 
-    # sets output equal to its result.
-    winner = check_diagonals(board)
-    
-    # If winner does not equal 0
-    if winner:
-        # Return the player number of the winner of the game.
-        return winner
-    # If no winner has been found, return 0
-    return no_winner
 
+def bitboard_winner(player1: int, player2: int, shifts: tuple[int, ...]) -> int:
+    """Returns the player number with four in a row along the shifts, or 0"""
+    if has_four(player1, shifts):
+        return 1
+    if has_four(player2, shifts):
+        return 2
+    return 0
 
 
+def check_winners(boards: NDArray[np.int_]) -> NDArray[np.int_]:
+    """Returns the winner (0, 1 or 2) of every board in an (N, rows, cols) array"""
+    boards = np.asarray(boards)
+    num_rows: int = boards.shape[1]
+    num_cols: int = boards.shape[2]
+    # Every board has to fit into a single unsigned 64 bit integer
+    if num_cols * (num_rows + 1) > 64:
+        raise ValueError(f"A {num_rows}x{num_cols} board does not fit in 64 bits")
 
-def check_horizontal(board: list[list[int]]) -> int:
+    # Weight of every square is its bit, so summing the weights of a player's
+    # squares packs a whole stack of boards into bitboards at once
+    rows, cols = np.indices((num_rows, num_cols))
+    weights: NDArray[np.uint64] = np.left_shift(
+        np.uint64(1), bit_index(rows, cols, num_rows).astype(np.uint64)  # type: ignore
+    )
+    player1: NDArray[np.uint64] = np.where(boards == 1, weights, np.uint64(0)).sum(
+        axis=(1, 2), dtype=np.uint64)
+    player2: NDArray[np.uint64] = np.where(boards == 2, weights, np.uint64(0)).sum(
+        axis=(1, 2), dtype=np.uint64)
+
+    # Same shift-and-AND test as has_four, applied to every board in one pass
+    all_shifts: tuple[int, ...] = tuple(
+        shift for shifts in direction_shifts(num_rows).values() for shift in shifts)
+    wins1: NDArray[np.bool_] = np.zeros(boards.shape[0], dtype=np.bool_)
+    wins2: NDArray[np.bool_] = np.zeros(boards.shape[0], dtype=np.bool_)
+    for shift in all_shifts:
+        one: np.uint64 = np.uint64(shift)
+        two: np.uint64 = np.uint64(2 * shift)
+        pairs1: NDArray[np.uint64] = player1 & (player1 >> one)
+        pairs2: NDArray[np.uint64] = player2 & (player2 >> one)
+        wins1 |= (pairs1 & (pairs1 >> two)) != 0
+        wins2 |= (pairs2 & (pairs2 >> two)) != 0
+
+    # Player 1 is reported first, the same as bitboard_winner
+    return np.where(wins1, 1, np.where(wins2, 2, 0))
+
+
+# ---------------------------------------------------------------------------
+# Line index for m,n,k boards
+# ---------------------------------------------------------------------------
+# Variant games use a board of any size and a run length k other than 4. Every
+# square is numbered row * cols + col, and each possible line of k squares is
+# one row of an index table, so a whole board is checked with a single gather.
+
+
+@lru_cache(maxsize=None)
+def winning_lines(rows: int, cols: int, k: int,
+                  direction: str | None = None) -> NDArray[np.intp]:
+    """Returns an (L, k) table of the square numbers of every line of k squares,
+    for one direction or (when direction is None) for all of them"""
+    if k < 1:
+        raise ValueError(f"Run length must be at least 1, not {k}")
+    squares: NDArray[np.intp] = np.arange(rows * cols).reshape(rows, cols)
+    steps: NDArray[np.intp] = np.arange(k)
+    # Starting squares of lines that fit inside the board
+    starts_r: NDArray[np.intp] = np.arange(max(rows - k + 1, 0))[:, None]
+    starts_c: NDArray[np.intp] = np.arange(max(cols - k + 1, 0))[None, :]
+
+    lines: dict[str, list[NDArray[np.intp]]] = {
+        "horizontal": [
+            squares[np.arange(rows)[:, None, None], starts_c[..., None] + steps]],
+        "vertical": [
+            squares[starts_r[..., None] + steps, np.arange(cols)[None, :, None]]],
+        "diagonals": [
+            # Down and to the right
+            squares[starts_r[..., None] + steps, starts_c[..., None] + steps],
+            # Down and to the left
+            squares[starts_r[..., None] + steps, starts_c[..., None] + k - 1 - steps],
+        ],
+    }
+    chosen: list[str] = list(lines) if direction is None else [direction]
+    table: NDArray[np.intp] = np.concatenate(
+        [part.reshape(-1, k) for name in chosen for part in lines[name]])
+    # The table is shared through the cache, so nobody may change it
+    table.setflags(write=False)
+    return table
+
+
+def line_winner(board: list[list[int]], k: int = 4, direction: str | None = None) -> int:
+    """Returns the player with k in a row along the direction (or any direction
+    when it is None), or 0 if there is none"""
+    squares: NDArray[np.int_] = np.asarray(board)
+    lines: NDArray[np.intp] = winning_lines(squares.shape[0], squares.shape[1], k, direction)
+    # Look up every line at once: one row of k values per line
+    cells: NDArray[np.int_] = squares.ravel()[lines]
+    won: NDArray[np.bool_] = (cells[:, 0] != 0) & (cells == cells[:, :1]).all(axis=1)
+    if not won.any():
+        return 0
+    # Player 1 is reported first, the same as bitboard_winner
+    return int(cells[won, 0].min())
+
+
+# ---------------------------------------------------------------------------
+# List-of-lists entry points
+# ---------------------------------------------------------------------------
+
+
+def check_winner(board: list[list[int]], k: int = 4) -> int:
+    """Defines the function to check the winner of the connect four game as 
+    a function of the list 'board', where k discs in a row win"""
+    # Other run lengths use the line index for the board's geometry
+    if k != 4:
+        return line_winner(board, k)
+    # Pack the board once and test every direction on the bitboards
+    player1, player2 = to_bitboards(board)
+    all_shifts: tuple[int, ...] = tuple(
+        shift for shifts in direction_shifts(len(board)).values() for shift in shifts)
+    # Player 1 is checked in every direction before player 2, the same as
+    # check_winners, so a board where both have four reports player 1
+    return bitboard_winner(player1, player2, all_shifts)
+
+
+def check_horizontal(board: list[list[int]], k: int = 4) -> int:
     """check_horizontal is a function of the list 'board' and its output 
     is equal to an integer."""
-    no_winner: int = 0
-    # For the rows in the connect 4 board (each item in board 
-        # represented by'horizontal')
-    for horizontal in board:
-        # Check each indices in each row, len(horizontal)-3 makes sure 
-            # that the loop runs within the boundaries of the row length
-        for vertical in range(len(horizontal)-3): 
-            # check_horizontal is a list equal to 4 equal, successive 
-            # integers within a row
-            check_horizontal: list[int] = [
-                horizontal[vertical], horizontal[vertical + 1], 
-                horizontal[vertical + 2], horizontal[vertical + 3]
-                ]
-            
-            # Sees if all items in check_horizontal are equal to
-              # horizontal[vertical]
-            check: bool = all(item == horizontal[vertical] and item !=0 
-                              for item in check_horizontal)
-            # If check_horizontal is in a row
-            if check:
-                 # Return the first value in the row with the 
-               #  connect four (winner number)
-                return horizontal[vertical]
-       # Return 0 if there is no horizontal winner      
-    return no_winner
+    if k != 4:
+        return line_winner(board, k, "horizontal")
+    player1, player2 = to_bitboards(board)
+    # Returns the winner along the rows, or 0 if there is no horizontal winner
+    return bitboard_winner(player1, player2, direction_shifts(len(board))["horizontal"])
    
 
-def check_vertical(board: list[list[int]]) -> int:
+def check_vertical(board: list[list[int]], k: int = 4) -> int:
     """check_vertical is a function of the list 'board' and its output is 
     equal to an integer."""
-    no_winner: int = 0
-    # Each column value is in a range the length of board
-    for vertical in range(len(board)):
-        # For each row in the range of the length of board- 3 
-            # (to keep the for loop in its boundaries)
-        for horizontal in range(len(board) - 3):
-           # List equal to 4 equal, successive items in board 
-            # that have the same index.
-            check_vertical: list[int] = [
-                board[horizontal][vertical],
-                board[horizontal+1][vertical],
-                board[horizontal+2][vertical],
-                board[horizontal+3][vertical]
-            ]
-            
-            #  Checks if the item is equal to the first item in the check_vertical list 
-            # and not equal to 0
-            check: bool = all(item == check_vertical[0] and item != 0 
-                              for item in check_vertical)
-            
-            if check:
-                # Returns the first value in the column 
-            # with the connect four (winner number)
-                return check_vertical[0]
-    # Returns 0 if there is no vertical winner      
-    return no_winner
-
-
-def check_diagonals(board: list[list[int]]) -> int:
-    no_winner: int = 0
-    # Checking diagonal to the right
-    # For each row in the range of the length of board- 3 
-        # (to keep the for loop in its boundaries)
-    for horizontal in range(len(board) - 3):
-         # Returns the range of the first sublist of board to get the number of 
-            # columns and subtract 3 to stay within the boundaries of the board. 
-            # Vertical represents the indices in the range (aka columns of board)
-        for vertical in range(len(board[0]) - 3):
-           
-           # List of items that are diagonally across 
-            # from each other in a positive slope.
-            check_diagonals: list[int] = [
-                board[horizontal][vertical],
-                board[horizontal + 1][vertical + 1],
-                board[horizontal + 2][vertical + 2],
-                board[horizontal + 3][vertical + 3]
-            ]
-            # Checks is all elements in check_diagonals are equal to its 
-                # first element and are not equal to 0
-            if all(item == check_diagonals[0] and item != 0 for item in check_diagonals):
-                # Returns the first value of the diagonal with the connect four
-                return check_diagonals[0]
-            
-
-    # Check diagonal to the left
-    for horizontal in range(len(board) - 3):
-        # Range starts at 3 and ends at len(board)-3 so we can stay within the 
-            # range of columns
-        for vertical in range(3, len(board[0])):
-            # List of items that are diagonally across from each other 
-            # with a negative slope.
-            check_diagonals = [
-                board[horizontal][vertical],
-                board[horizontal + 1][vertical - 1],
-                board[horizontal + 2][vertical - 2],
-                board[horizontal + 3][vertical - 3]
-            ]
-            #Checks is all elements in check_diagonals are equal to its first
-                # element and are not equal to 0
-            if all(item == check_diagonals[0] and item != 0 for item in check_diagonals):
-                # Returns the first value of the diagonal with the connect four
-                return check_diagonals[0]
-            
-# Returns 0 if there is no diagonal winner 
-    return no_winner
+    if k != 4:
+        return line_winner(board, k, "vertical")
+    player1, player2 = to_bitboards(board)
+    # Returns the winner along the columns, or 0 if there is no vertical winner
+    return bitboard_winner(player1, player2, direction_shifts(len(board))["vertical"])
+
+
+def check_diagonals(board: list[list[int]], k: int = 4) -> int:
+    """check_diagonals is a function of the list 'board' and its output is 
+    equal to an integer."""
+    if k != 4:
+        return line_winner(board, k, "diagonals")
+    player1, player2 = to_bitboards(board)
+    # Returns the winner along both diagonals, or 0 if there is no diagonal winner
+    return bitboard_winner(player1, player2, direction_shifts(len(board))["diagonals"])
+
+
+# ---------------------------------------------------------------------------
+# Incremental games
+# ---------------------------------------------------------------------------
+
 
+class Connect4Game:
+    """A connect four game that is played one disc at a time"""
 
+    def __init__(self, rows: int = ROWS, cols: int = COLS, k: int = 4) -> None:
+        self.rows: int = rows
+        self.cols: int = cols
+        # Number of discs in a row needed to win
+        self.k: int = k
+        # One bitboard per player, in the same layout as to_bitboards
+        self.bitboards: list[int] = [0, 0]
+        # Number of discs already stacked in each column
+        self.heights: list[int] = [0] * cols
+        # Columns played so far, in order
+        self.moves: list[int] = []
+        # Player number of the winner, or 0 while nobody has k in a row
+        self.winner: int = 0
+        # Every shift that moves one square along a line
+        self.shifts: tuple[int, ...] = tuple(
+            shift for shifts in direction_shifts(rows).values() for shift in shifts)
 
+    def can_drop(self, column: int) -> bool:
+        """Returns True if a disc can still be dropped into the column"""
+        return 0 <= column < self.cols and self.heights[column] < self.rows
+
+    def drop(self, column: int, player: int) -> int:
+        """Drops a disc for the player into the column and returns the winner"""
+        if self.winner:
+            raise ValueError(f"Player {self.winner} has already won this game")
+        if player not in (1, 2):
+            raise ValueError(f"Player must be 1 or 2, not {player}")
+        if not self.can_drop(column):
+            raise ValueError(f"Cannot drop a disc into column {column}")
+
+        # The new disc lands on top of the discs already in the column
+        bit: int = column * (self.rows + 1) + self.heights[column]
+        self.bitboards[player - 1] |= 1 << bit
+        self.heights[column] += 1
+        self.moves.append(column)
+
+        # Only the lines through the new disc can have become k in a row
+        if self.completes_run(bit, self.bitboards[player - 1]):
+            self.winner = player
+        return self.winner
+
+    def completes_run(self, bit: int, bitboard: int) -> bool:
+        """Returns True if the disc at bit is part of k in a row"""
+        for shift in self.shifts:
+            # Count the disc itself plus its neighbours on both sides of the line.
+            # The empty top bit of every column stops the walk at the board edges.
+            run: int = 1
+            for step in (shift, -shift):
+                square: int = bit + step
+                while run < self.k and square >= 0 and bitboard >> square & 1:
+                    run += 1
+                    square += step
+            if run >= self.k:
+                return True
+        return False
+
+    def is_full(self) -> bool:
+        """Returns True if there are no empty squares left"""
+        return len(self.moves) == self.rows * self.cols
+
+    @property
+    def board(self) -> list[list[int]]:
+        """Returns the game as a list-of-lists board, top row first"""
+        board: list[list[int]] = [[0] * self.cols for _ in range(self.rows)]
+        for player in (1, 2):
+            for row in range(self.rows):
+                for col in range(self.cols):
+                    if self.bitboards[player - 1] >> bit_index(row, col, self.rows) & 1:
+                        board[row][col] = player
+        return board
+
+
+def replay_game(moves: list[int], rows: int = ROWS, cols: int = COLS,
+                k: int = 4) -> tuple[int, int]:
+    """Replays a game log of columns (player 1 moves first) and returns the
+    winner and the number of moves it took, or (0, number of moves)"""
+    game: Connect4Game = Connect4Game(rows, cols, k)
+    for move_number, column in enumerate(moves, start=1):
+        # Players take turns, so odd moves belong to player 1
+        if game.drop(column, 2 - move_number % 2):
+            return game.winner, move_number
+    return 0, len(moves)
+
+
+# ---------------------------------------------------------------------------
+# Solver
+# ---------------------------------------------------------------------------
+# The solver scores a position from the point of view of the player to move,
+# using the convention from http://blog.gamesolver.org/:
+#   positive: the player to move can force a win, larger means a quicker win
+#   0:        a draw, or nothing forced within the depth that was searched
+#   negative: the opponent can force a win
+
+
+class SearchResult(typing.NamedTuple):
+    """Outcome of one call to Connect4Solver.solve"""
+    score: int
+    best_move: int
+    depth: int
+    exact: bool
+    nodes: int
+    elapsed: float
+    nodes_per_second: float
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget has been used up"""
+
+
+class TranspositionTable:
+    """Fixed size table of search results keyed by the compact position key"""
+
+    # Bound types stored next to a value
+    EXACT: int = 0
+    LOWER: int = 1
+    UPPER: int = 2
+
+    def __init__(self, size: int = 1_000_003) -> None:
+        # A prime size spreads the keys evenly over the slots
+        self.size: int = size
+        self.keys: list[int] = [0] * size
+        self.depths: list[int] = [0] * size
+        self.flags: list[int] = [0] * size
+        self.values: list[int] = [0] * size
+
+    def get(self, key: int) -> tuple[int, int, int] | None:
+        """Returns (depth, flag, value) stored for the key, or None"""
+        slot: int = key % self.size
+        if self.keys[slot] != key:
+            return None
+        return self.depths[slot], self.flags[slot], self.values[slot]
+
+    def put(self, key: int, depth: int, flag: int, value: int) -> None:
+        """Stores a result, replacing whatever was in the key's slot"""
+        slot: int = key % self.size
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.values[slot] = value
+
+
+class Connect4Solver:
+    """Negamax search with alpha-beta pruning, a transposition table and
+    iterative deepening"""
+
+    def __init__(self, rows: int = ROWS, cols: int = COLS,
+                 table_size: int = 1_000_003) -> None:
+        self.rows: int = rows
+        self.cols: int = cols
+        self.table: TranspositionTable = TranspositionTable(table_size)
+        self.shifts: tuple[int, ...] = tuple(
+            shift for shifts in direction_shifts(rows).values() for shift in shifts)
+        # Center columns take part in the most lines, so they are tried first
+        self.order: list[int] = sorted(range(cols), key=lambda col: abs(2 * col - cols + 1))
+        # Lowest square, top square and all squares of every column
+        self.bottom: list[int] = [1 << col * (rows + 1) for col in range(cols)]
+        self.top: list[int] = [1 << (rows - 1 + col * (rows + 1)) for col in range(cols)]
+        self.column: list[int] = [((1 << rows) - 1) << col * (rows + 1) for col in range(cols)]
+        self.nodes: int = 0
+        self.deadline: float = 0.0
+
+    def is_winning_move(self, current: int, mask: int, col: int) -> bool:
+        """Returns True if the player to move wins by playing the column"""
+        landed: int = (mask + self.bottom[col]) & self.column[col]
+        return has_four(current | landed, self.shifts)
+
+    def negamax(self, current: int, mask: int, moves: int, depth: int,
+                alpha: int, beta: int) -> int:
+        """Scores the position for the player whose discs are in current"""
+        self.nodes += 1
+        # Looking at the clock is slow, so only do it every few thousand nodes
+        if self.nodes & 4095 == 0 and perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        squares: int = self.rows * self.cols
+        if moves == squares:
+            return 0
+        playable: list[int] = [col for col in self.order if not mask & self.top[col]]
+        for col in playable:
+            if self.is_winning_move(current, mask, col):
+                return (squares + 1 - moves) // 2
+        if depth == 0:
+            return 0
+
+        # We cannot win on this move, so the best we can hope for is the next one
+        best_possible: int = (squares - 1 - moves) // 2
+        if beta > best_possible:
+            beta = best_possible
+            if alpha >= beta:
+                return beta
+
+        # Key is unique for every position: the mask plus the mover's discs
+        key: int = current + mask
+        entry: tuple[int, int, int] | None = self.table.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value = entry
+            if flag == TranspositionTable.EXACT:
+                return value
+            if flag == TranspositionTable.LOWER and value > alpha:
+                alpha = value
+            elif flag == TranspositionTable.UPPER and value < beta:
+                beta = value
+            if alpha >= beta:
+                return value
+
+        alpha_start: int = alpha
+        best: int = -squares
+        for col in playable:
+            # Swap sides, then add the new disc to the mask
+            score: int = -self.negamax(current ^ mask, mask | (mask + self.bottom[col]),
+                                       moves + 1, depth - 1, -beta, -alpha)
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best <= alpha_start:
+            self.table.put(key, depth, TranspositionTable.UPPER, best)
+        elif best >= beta:
+            self.table.put(key, depth, TranspositionTable.LOWER, best)
+        else:
+            self.table.put(key, depth, TranspositionTable.EXACT, best)
+        return best
+
+    def search_root(self, current: int, mask: int, moves: int, depth: int,
+                    first: int) -> tuple[int, int]:
+        """Searches every move at the root and returns (score, best column)"""
+        squares: int = self.rows * self.cols
+        alpha: int = -squares
+        beta: int = squares
+        best_move: int = -1
+        # The best move from the previous iteration is searched first
+        order: list[int] = [first] + [col for col in self.order if col != first]
+        for col in order:
+            if col < 0 or mask & self.top[col]:
+                continue
+            score: int = -self.negamax(current ^ mask, mask | (mask + self.bottom[col]),
+                                       moves + 1, depth - 1, -beta, -alpha)
+            if best_move < 0 or score > alpha:
+                alpha = score
+                best_move = col
+        return alpha, best_move
+
+    def solve(self, board: list[list[int]], time_budget: float = 1.0,
+              max_depth: int | None = None) -> SearchResult:
+        """Scores a list-of-lists board for the player to move (player 1 moves
+        first), deepening the search until the position is solved or the time
+        budget in seconds runs out"""
+        player1, player2 = to_bitboards(board)
+        mask: int = player1 | player2
+        moves: int = bin(mask).count("1")
+        # Player 1 moves whenever both players have the same number of discs
+        current: int = player1 if moves % 2 == 0 else player2
+        if bitboard_winner(player1, player2, self.shifts):
+            raise ValueError("The game on this board is already over")
+
+        squares: int = self.rows * self.cols
+        remaining: int = squares - moves
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+
+        self.nodes = 0
+        start: float = perf_counter()
+        self.deadline = start + time_budget
+        score: int = 0
+        best_move: int = -1
+        completed: int = 0
+        # Playing an immediate win needs no search at all
+        for col in self.order:
+            if not mask & self.top[col] and self.is_winning_move(current, mask, col):
+                score, best_move, completed, max_depth = (squares + 1 - moves) // 2, col, 1, 0
+                break
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, best_move = self.search_root(current, mask, moves, depth, best_move)
+            except SearchTimeout:
+                break
+            completed = depth
+            # A won or lost score is proven, deeper searches cannot change it
+            if score != 0:
+                break
+
+        elapsed: float = perf_counter() - start
+        exact: bool = score != 0 or completed == remaining
+        return SearchResult(score, best_move, completed, exact, self.nodes, elapsed,
+                            self.nodes / elapsed if elapsed > 0 else 0.0)
 
 
 def print_winner(board: list[list[int]]) -> None:
@@ -226,7 +606,28 @@ def main() -> None:
         [0, 1, 1, 2, 1, 2, 0],
     ]
     print_winner(board3)
-    
+
+    # Replaying a game log one move at a time
+    moves: list[int] = [3, 3, 4, 4, 2, 5, 1]
+    winner, move_number = replay_game(moves)
+    print(f"Game log {moves}: Player {winner} wins on move {move_number}")
+    print()
+
+    # Scoring a position for the player to move
+    board4: list[list[int]] = [
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 0, 0, 0],
+        [0, 0, 0, 1, 2, 0, 0],
+        [0, 0, 1, 1, 2, 0, 0],
+    ]
+    print(*board4, sep="\n")
+    result: SearchResult = Connect4Solver().solve(board4, time_budget=2.0)
+    print(f"Score {result.score} (exact: {result.exact}), best column {result.best_move}, "
+          f"depth {result.depth}")
+    print(f"Nodes searched: {result.nodes:,} ({result.nodes_per_second:,.0f} nodes/sec)")
+
 
 if __name__ == "__main__":
     """Calls the main function """
@@ -3,33 +3,141 @@
 
 # This code attempts to factor quadratic expressions.
 # Code is modified from that given by Dr. David Biersach in factor_quadratic.py.
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Quadratic_formula
+# https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+
+# Imports the typing module to aid with type hints
+import typing
+
+# Used for the greatest common divisor and exact integer square roots
+from functools import lru_cache
+from math import gcd, isqrt
+
+# Deterministic Miller-Rabin test for 64 bit integers
+from prime_racer4 import TRIAL_PRIMES, is_prime_mr
+
+
+class Factorization(typing.NamedTuple):
+    """The factors (ax + b)(cx + d) of a quadratic"""
+
+    a: int
+    b: int
+    c: int
+    d: int
+
+    def __str__(self) -> str:
+        return f"{format_factor(self.a, self.b)}{format_factor(self.c, self.d)}"
+
+
+def format_factor(coefficient: int, constant: int) -> str:
+    """Formats one linear factor, such as (3x + 2) or (3x - 2)"""
+    sign: str = "-" if constant < 0 else "+"
+    return f"({coefficient}x {sign} {abs(constant)})"
+
+
+def pollard_rho(n: int) -> int:
+    """Returns a nontrivial factor of the odd composite n (Brent's variant)"""
+    # Try the pseudo-random sequences x -> x^2 + c mod n until one finds a factor
+    for c in range(1, n):
+        x: int = 2
+        y: int = 2
+        factor: int = 1
+        power: int = 1
+        steps: int = 0
+        while factor == 1:
+            # Brent's cycle detection: y jumps ahead to x at every power of 2
+            if steps == power:
+                y = x
+                power *= 2
+                steps = 0
+            x = (x * x + c) % n
+            steps += 1
+            factor = gcd(abs(x - y), n)
+        if factor != n:
+            return factor
+    raise ValueError(f"No factor found for {n}")
+
+
+@lru_cache(maxsize=4096)
+def prime_factors(n: int) -> dict[int, int]:
+    """Returns the prime factorization of n > 0 as {prime: exponent}"""
+    factors: dict[int, int] = {}
+    # Small primes first, by trial division
+    for prime in TRIAL_PRIMES:
+        while n % prime == 0:
+            factors[prime] = factors.get(prime, 0) + 1
+            n //= prime
+    # Whatever is left has no small factors: split it until only primes remain
+    remaining: list[int] = [n] if n > 1 else []
+    while remaining:
+        m: int = remaining.pop()
+        if is_prime_mr(m):
+            factors[m] = factors.get(m, 0) + 1
+        else:
+            factor: int = pollard_rho(m)
+            remaining += [factor, m // factor]
+    return dict(sorted(factors.items()))
+
+
+def divisors(n: int) -> list[int]:
+    """Returns every positive divisor of n > 0 in increasing order"""
+    result: list[int] = [1]
+    for prime, exponent in prime_factors(n).items():
+        result = [divisor * prime**power for divisor in result for power in range(exponent + 1)]
+    return sorted(result)
+
+
+def primitive_factor(h: int, numerator: int) -> tuple[int, int]:
+    """Reduces the factor (2h x + numerator) to lowest terms with a positive x term"""
+    common: int = gcd(2 * h, numerator)
+    p: int = 2 * h // common
+    q: int = numerator // common
+    return (p, q) if p > 0 else (-p, -q)
+
+
+def quadratic_factors(h: int, i: int, j: int) -> list[Factorization]:
+    """Returns every integer factorization (ax + b)(cx + d) of hx^2 + ix + j with a > 0"""
+    if h == 0:
+        raise ValueError("The x^2 coefficient of a quadratic cannot be 0")
+    # The quadratic factors over the integers exactly when the discriminant
+    # is a perfect square, and then its roots are (-i ± s) / 2h
+    discriminant: int = i * i - 4 * h * j
+    if discriminant < 0 or isqrt(discriminant) ** 2 != discriminant:
+        return []
+    s: int = isqrt(discriminant)
+
+    # hx^2 + ix + j = content * (p1 x + q1)(p2 x + q2) with both factors primitive
+    p1, q1 = primitive_factor(h, i - s)
+    p2, q2 = primitive_factor(h, i + s)
+    content: int = h // (p1 * p2)
+
+    # Every factorization splits the content between the two factors
+    found: set[Factorization] = set()
+    for e in divisors(abs(content)):
+        f: int = content // e
+        found.add(Factorization(e * p1, e * q1, f * p2, f * q2))
+        found.add(Factorization(e * p2, e * q2, f * p1, f * q1))
+    return sorted(found)
+
+
+def factor_quadratics(coefficients: list[tuple[int, int, int]]) -> list[list[Factorization]]:
+    """Factors many quadratics (h, i, j) at once"""
+    return [quadratic_factors(h, i, j) for h, i, j in coefficients]
 
 
 def factor_quadratic(h: int, i: int, j: int) -> None:
     """Displays factors of the quadratic polynomial Jx^2 + Kx + L"""
     print(f"Given the quadratic: {h}x^2 + {i}x + {j}")
-    # Set up a boolean variable for factored or not factored
-    # just to make sure the statement in line 36 will only be printed once.
-    factored: bool = False
-
-    # For h, we must try for every integer a where 1 ≤ 𝒂 ≤ h.
-    for a in range(1, h + 1):
-        # If there is no remainder
-        if h % a == 0:
-            # C is updated.
-            c: int = h // a
-            # For j, we must try for every integer b where 1 ≤ b ≤ j.
-            for b in range(1, j + 1):
-                # If there is no remainder
-                if j % b == 0:
-                    # d is updated
-                    d: int = j // b
-                    # If this is true (𝒂𝒅+𝒃𝒄)==i, the quadratic has been factored.
-                    if int(a * d + b * c) == i:
-                        print(f"The factors are: ({a}x + {b})({c}x + {d})")
-                        factored = True  # factored boolean variable is reset to true.
-
-    if not factored:
+    factorizations: list[Factorization] = quadratic_factors(h, i, j)
+
+    for factorization in factorizations:
+        print(f"The factors are: {factorization}")
+
+    if not factorizations:
         # If not factored, print
         print(f"The expression {h}x^2 + {i}x + {j} cannot be factored")
 
@@ -37,6 +145,10 @@ def factor_quadratic(h: int, i: int, j: int) -> None:
 def main() -> None:  # Defines an entry point for the code.
     # Calls factor_quadratic for the given variables.
     factor_quadratic(115425, 3254121, 379021)
+    # Signed coefficients and coefficients near 10^18
+    factor_quadratic(6, -1, -2)
+    # (1000000007x + 3)(1000000009x - 5)
+    factor_quadratic(1000000016000000063, -2000000008, -15)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""gcf_search.py"""
+
+# This code searches for generalized continued fractions (GCF's) of the form 
+# (a0, b0, Ai, Bi, Ci, Di, Ei) used by gen_continued_fractions.py that converge 
+# quickly to a target constant such as pi. 
+# Code is built on decode_gencf and print_rel_error from gen_continued_fractions.py. 
+
+# fmt: off
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Import the math module for the target constant
+import math
+# Used to list every form within the bounds
+from itertools import product
+# Used to evaluate the forms on several processes
+from concurrent.futures import ProcessPoolExecutor
+# Import process time so we can time the search
+from time import perf_counter
+# Import allows us to evaluate many forms at once as arrays
+import numpy as np
+# Batch evaluation and the error printout of gen_continued_fractions.py
+from gen_continued_fractions import gencf_convergents, print_rel_error
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Number of tails (Ai, Bi, Ci, Di, Ei) handed to a worker process at a time
+CHUNK_SIZE: int = 2_000
+
+
+# The convergents h_n / k_n of a form only depend on a0 and b0 in a simple way.
+# k_n never involves a0 or b0, and h_n - a0 k_n follows the same recurrence as
+# k_n, starting from 0 and b0 instead. So every convergent is
+#
+#     h_n / k_n = a0 + b0 * r_n
+#
+# where r_n is the n-th convergent of the form (0, 1, Ai, Bi, Ci, Di, Ei). The
+# search evaluates r_n once for every tail (Ai, Bi, Ci, Di, Ei) and shares it
+# between all the (a0, b0) pairs, instead of running the recurrence again for
+# each of them.
+
+
+class SearchHit(typing.NamedTuple):
+    """One form found by the search"""
+    form: tuple[int, ...]
+    estimate: float
+    rel_error: float
+    # Number of terms after which the form stays within the tolerance
+    terms: int
+
+
+def tail_ratios(tails: NDArray[np.int64], num_terms: int) -> NDArray[np.float64]:
+    """Returns the convergents r_n of (0, 1, Ai, Bi, Ci, Di, Ei) for every tail"""
+    heads: NDArray[np.int64] = np.tile([0, 1], (len(tails), 1))
+    return gencf_convergents(np.hstack((heads, tails)), num_terms)
+
+
+def search_chunk(tails: NDArray[np.int64], heads: NDArray[np.int64], target: float,
+                 num_terms: int, early_terms: int, tolerance: float,
+                 leaderboard_size: int) -> list[SearchHit]:
+    """Evaluates every (a0, b0) head with every tail and returns the best forms"""
+    # Early rejection: drop tails that blow up or are still jumping around
+    # after the first few terms, before evaluating all of the terms
+    early: NDArray[np.float64] = tail_ratios(tails, early_terms)
+    with np.errstate(invalid="ignore"):
+        settled: NDArray[np.bool_] = np.isfinite(early).all(axis=1) & (
+            np.abs(early[:, -1] - early[:, -2]) <= 1e-2 * (1 + np.abs(early[:, -1])))
+    tails = tails[settled]
+    if len(tails) == 0:
+        return []
+    ratios: NDArray[np.float64] = tail_ratios(tails, num_terms)
+
+    # Convergents of every (tail, head) pair, shape (tails, heads, terms)
+    a0: NDArray[np.float64] = heads[:, 0].astype(np.float64)[None, :, None]
+    b0: NDArray[np.float64] = heads[:, 1].astype(np.float64)[None, :, None]
+    with np.errstate(invalid="ignore", over="ignore"):
+        errors: NDArray[np.float64] = np.abs(a0 + b0 * ratios[:, None, :] - target) / abs(target)
+    # Count the terms from the end for which the error stays within tolerance
+    within: NDArray[np.bool_] = errors < tolerance
+    stays: NDArray[np.bool_] = np.logical_and.accumulate(within[..., ::-1], axis=-1)[..., ::-1]
+    converged: NDArray[np.bool_] = stays[..., -1]
+    # Terms used to get there: the column where the error settles, plus a0
+    terms: NDArray[np.int64] = np.argmax(stays, axis=-1) + 1
+
+    hits: list[SearchHit] = []
+    tail_ids, head_ids = np.nonzero(converged)
+    # Fewest terms first, then the smallest final error
+    order: NDArray[np.intp] = np.lexsort((errors[tail_ids, head_ids, -1],
+                                          terms[tail_ids, head_ids]))
+    for i in order[:leaderboard_size].tolist():
+        tail, head = tail_ids[i], head_ids[i]
+        estimate: float = float(heads[head, 0] + heads[head, 1] * ratios[tail, -1])
+        hits.append(SearchHit(tuple(heads[head].tolist()) + tuple(tails[tail].tolist()),
+                              estimate, float(errors[tail, head, -1]), int(terms[tail, head])))
+    return hits
+
+
+def search_forms(target: float = math.pi, a0_range: range = range(0, 5),
+                 b0_range: range = range(1, 10), coeff_range: range = range(-4, 5),
+                 num_terms: int = 20, early_terms: int = 8, tolerance: float = 1e-12,
+                 leaderboard_size: int = 10, num_workers: int | None = None,
+                 chunk_size: int = CHUNK_SIZE) -> list[SearchHit]:
+    """Searches every form within the bounds for those converging fastest to target"""
+    heads: NDArray[np.int64] = np.array(list(product(a0_range, b0_range)), dtype=np.int64)
+    tails: NDArray[np.int64] = np.array(list(product(coeff_range, repeat=5)), dtype=np.int64)
+    chunks: list[NDArray[np.int64]] = [
+        tails[start:start + chunk_size] for start in range(0, len(tails), chunk_size)]
+
+    hits: list[SearchHit] = []
+    with ProcessPoolExecutor(num_workers) as pool:
+        for chunk_hits in pool.map(search_chunk, chunks, *(
+                [value] * len(chunks) for value in
+                (heads, target, num_terms, early_terms, tolerance, leaderboard_size))):
+            hits.extend(chunk_hits)
+    # Merge the leaderboards of the chunks
+    hits.sort(key=lambda hit: (hit.terms, hit.rel_error))
+    return hits[:leaderboard_size]
+
+
+def print_leaderboard(hits: list[SearchHit], target: float) -> None:
+    """Prints the forms found in the style of gen_continued_fractions.py"""
+    for rank, hit in enumerate(hits, start=1):
+        print(f"#{rank} {hit.form} ({hit.terms} terms)")
+        print_rel_error(hit.estimate, target)
+
+
+def main() -> None:
+    """Search for GCF's of pi"""
+    start_time: float = perf_counter()
+    hits: list[SearchHit] = search_forms(math.pi)
+    elapsed_time: float = perf_counter() - start_time
+    print(f"Generalized Continued Fractions for Pi (search took {elapsed_time:.3f} sec)\n")
+    print_leaderboard(hits, math.pi)
+
+
+if __name__ == "__main__":
+    main()
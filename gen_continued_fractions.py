@@ -5,8 +5,22 @@
 # and one found by Euler. 
 # Code is copied from Dr. David Biersach 
 
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
 # Import the math module for later calculations
 import math
+# Exact rational numbers, and decimals with as many digits as we ask for
+from decimal import Decimal, localcontext
+from fractions import Fraction
+# Import allows us to evaluate many forms at once as arrays
+import numpy as np
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
 
 # Maximum number of terms in the continued fraction
 MAX_TERMS: int = 20
@@ -60,6 +74,81 @@ def decode_gencf(form: tuple[int, ...]) -> float:
         # # to the original number of x
     return hn / kn
 
+# Most terms the exact evaluation will use before giving up
+MAX_EXACT_TERMS: int = 100_000
+
+
+
+def decode_gencf_exact(form: tuple[int, ...], tolerance: Fraction = Fraction(1, 10**30),
+                       max_terms: int = MAX_EXACT_TERMS) -> tuple[Fraction, int]:
+    """Evaluates a generalized continued fraction exactly, adding terms until two
+    successive convergents differ by less than tolerance. Returns the last
+    convergent and the number of terms used."""
+
+    # Same recurrence as decode_gencf, but with Python's exact integers
+    a0, b0, Ai, Bi, Ci, Di, Ei = form
+    an, bn = a0, b0
+    b_1, h_1, k_1 = 1, 1, 0
+    h_2, k_2 = 0, 1
+
+    for n in range(1, max_terms):
+        hn: int = an * h_1 + b_1 * h_2
+        kn: int = an * k_1 + b_1 * k_2
+        # |hn/kn - h_1/k_1| = |hn k_1 - h_1 kn| / |kn k_1|, compared without dividing
+        if kn != 0 and k_1 != 0 and (
+                abs(hn * k_1 - h_1 * kn) < tolerance * abs(kn * k_1)):
+            return Fraction(hn, kn), n
+        b_1 = bn
+        h_1, h_2 = hn, h_1
+        k_1, k_2 = kn, k_1
+        an = Di * n + Ei
+        bn = Ai * n * n + Bi * n + Ci
+
+    raise ValueError(f"{form} did not converge within {max_terms:,} terms")
+
+
+def to_decimal(value: Fraction, digits: int) -> Decimal:
+    """Returns an exact fraction as a decimal with the given significant digits"""
+    with localcontext() as context:
+        context.prec = digits
+        return Decimal(value.numerator) / Decimal(value.denominator)
+
+
+def gencf_convergents(forms: NDArray[np.int64],
+                      num_terms: int = MAX_TERMS) -> NDArray[np.float64]:
+    """Evaluates many generalized continued fractions at once. forms is an
+    (M, 7) array of (a0, b0, Ai, Bi, Ci, Di, Ei) rows, and the result is the
+    (M, num_terms - 1) array of their convergents, one column per term."""
+
+    # Each column of forms becomes an array with one entry per form
+    a0, b0, Ai, Bi, Ci, Di, Ei = np.asarray(forms, dtype=np.float64).T
+    an, bn = a0, b0
+    b_1, h_1, k_1 = np.ones_like(a0), np.ones_like(a0), np.zeros_like(a0)
+    h_2, k_2 = np.zeros_like(a0), np.ones_like(a0)
+
+    convergents: NDArray[np.float64] = np.empty((a0.size, num_terms - 1))
+    # Dividing by 0 or inf gives nan for forms that blow up, without warnings
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for n in range(1, num_terms):
+            hn: NDArray[np.float64] = an * h_1 + b_1 * h_2
+            kn: NDArray[np.float64] = an * k_1 + b_1 * k_2
+            convergents[:, n - 1] = hn / kn
+            # hn and kn grow like factorials, so scale both pairs down by the
+            # same power of 2 (which is exact) to keep them inside float range
+            _, exponent = np.frexp(np.maximum(np.abs(hn), np.abs(kn)))
+            h_1, h_2 = np.ldexp(hn, -exponent), np.ldexp(h_1, -exponent)
+            k_1, k_2 = np.ldexp(kn, -exponent), np.ldexp(k_1, -exponent)
+            b_1 = bn
+            an = Di * n + Ei
+            bn = Ai * n * n + Bi * n + Ci
+    return convergents
+
+
+def decode_gencf_batch(forms: NDArray[np.int64],
+                       num_terms: int = MAX_TERMS) -> NDArray[np.float64]:
+    """Evaluates many generalized continued fractions at once, like decode_gencf"""
+    return gencf_convergents(forms, num_terms)[:, -1]
+
 
 
 def print_rel_error(estimated: float, actual: float) -> None:
@@ -102,6 +191,16 @@ def main() -> None:
     # Calculate error between x and pi
     print_rel_error(x, math.pi)
 
+    # Evaluate all three GCF's at once
+    forms: NDArray[np.int64] = np.array(
+        [(3, 1, 4, 4, 1, 0, 6), (3, 1, 8, 0, -7, 8, -1), (2, 8, 4, 8, 0, 4, 2)])
+    print(f"Batch evaluation: {decode_gencf_batch(forms)}\n")
+
+    # Evaluate Biersach's 2nd GCF exactly, until it has settled to 50 digits
+    print("Biersach's Generalized Continued Fraction #2 for Pi to 50 digits")
+    exact, num_terms = decode_gencf_exact((2, 8, 4, 8, 0, 4, 2), Fraction(1, 10**50))
+    print(f"Est.        : {to_decimal(exact, 50)} ({num_terms} terms)")
+
 if __name__ == "__main__":
     main()
     # Call the main function 
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""hamming_distance.py"""
+
+# This code finds near-duplicate bit signatures (such as 64 bit fingerprints) by
+# their Hamming distance, the number of bits in which two signatures differ.
+# The distance is the Hamming weight of the XOR of the two signatures, so it is
+# built on the vectorized popcount in hamming_weight.py.
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Hamming_distance
+# https://www.cs.toronto.edu/~norouzi/research/papers/multi_index_hashing.pdf
+
+# fmt: off
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Used to list every way of flipping a few bits of a block
+from functools import lru_cache
+from itertools import combinations
+# Used to time the index against a brute force scan
+from time import process_time
+# Import allows us to compare whole arrays of signatures at once
+import numpy as np
+# Vectorized population count
+from hamming_weight import popcount
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Number of signatures compared against all others in one step of a scan,
+# this bounds the size of the (block x N) distance arrays
+BLOCK_SIZE: int = 1_024
+
+
+def hamming_distances(a: NDArray[np.uint64], b: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    """Returns the (len(a), len(b)) array of distances between two sets of signatures"""
+    a = np.asarray(a, dtype=np.uint64)
+    b = np.asarray(b, dtype=np.uint64)
+    return popcount(a[:, None] ^ b[None, :])
+
+
+def all_pairs_distances(signatures: NDArray[np.uint64],
+                        block_size: int = BLOCK_SIZE) -> NDArray[np.uint8]:
+    """Returns the full (N, N) distance matrix, filled in one block of rows at a time"""
+    signatures = np.asarray(signatures, dtype=np.uint64)
+    distances: NDArray[np.uint8] = np.empty((signatures.size, signatures.size), dtype=np.uint8)
+    for start in range(0, signatures.size, block_size):
+        distances[start:start + block_size] = hamming_distances(
+            signatures[start:start + block_size], signatures)
+    return distances
+
+
+def k_nearest(signatures: NDArray[np.uint64], queries: NDArray[np.uint64], k: int,
+              block_size: int = BLOCK_SIZE) -> tuple[NDArray[np.intp], NDArray[np.uint8]]:
+    """Returns the indices and distances of the k signatures nearest to each
+    query, closest first, by scanning the signatures in blocks of queries"""
+    signatures = np.asarray(signatures, dtype=np.uint64)
+    queries = np.asarray(queries, dtype=np.uint64)
+    k = min(k, signatures.size)
+    indices: NDArray[np.intp] = np.empty((queries.size, k), dtype=np.intp)
+    nearest_distances: NDArray[np.uint8] = np.empty((queries.size, k), dtype=np.uint8)
+    for start in range(0, queries.size, block_size):
+        distances: NDArray[np.uint8] = hamming_distances(
+            queries[start:start + block_size], signatures)
+        # Pick out the k smallest of every row, then put just those in order
+        nearest: NDArray[np.intp] = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest_rows: NDArray[np.uint8] = np.take_along_axis(distances, nearest, axis=1)
+        order: NDArray[np.intp] = np.argsort(nearest_rows, axis=1, kind="stable")
+        indices[start:start + block_size] = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances[start:start + block_size] = np.take_along_axis(
+            nearest_rows, order, axis=1)
+    return indices, nearest_distances
+
+
+# ---------------------------------------------------------------------------
+# Multi-index hashing
+# ---------------------------------------------------------------------------
+# Every signature is cut into m blocks of bits. If two signatures are within
+# distance r, then (pigeonhole principle) at least one of their m blocks differs
+# in at most r // m bits. So a radius query only has to look up, in each block's
+# table, the values within r // m bits of the query's block, and then check the
+# distance of those few candidates instead of scanning every signature.
+
+
+@lru_cache(maxsize=None)
+def flip_masks(width: int, radius: int) -> NDArray[np.uint64]:
+    """Returns every mask of at most radius bits within a block of width bits"""
+    masks: list[int] = [
+        sum(1 << bit for bit in bits)
+        for flips in range(min(radius, width) + 1)
+        for bits in combinations(range(width), flips)
+    ]
+    return np.array(masks, dtype=np.uint64)
+
+
+class MultiIndexHash:
+    """Index of fixed width bit signatures for Hamming radius queries. Choose
+    num_blocks so that radius // num_blocks stays at 0, 1 or 2."""
+
+    def __init__(self, signatures: NDArray[np.uint64], num_blocks: int = 4,
+                 bits: int = 64) -> None:
+        self.signatures: NDArray[np.uint64] = np.asarray(signatures, dtype=np.uint64)
+        self.num_blocks: int = num_blocks
+        # Split the bits as evenly as possible, e.g. 64 bits into 16+16+16+16
+        widths: list[int] = [bits // num_blocks + (i < bits % num_blocks)
+                             for i in range(num_blocks)]
+        self.widths: list[int] = widths
+        self.shifts: list[int] = [sum(widths[:i]) for i in range(num_blocks)]
+        # For every block: the block values in sorted order, and which
+        # signature each sorted value came from
+        self.sorted_values: list[NDArray[np.uint64]] = []
+        self.sorted_ids: list[NDArray[np.intp]] = []
+        for i in range(num_blocks):
+            values: NDArray[np.uint64] = self.block(self.signatures, i)
+            order: NDArray[np.intp] = np.argsort(values, kind="stable")
+            self.sorted_values.append(values[order])
+            self.sorted_ids.append(order)
+
+    def block(self, signatures: NDArray[np.uint64], i: int) -> NDArray[np.uint64]:
+        """Returns block i of every signature"""
+        mask: np.uint64 = np.uint64((1 << self.widths[i]) - 1)
+        return (signatures >> np.uint64(self.shifts[i])) & mask
+
+    def candidates(self, query: int, radius: int) -> NDArray[np.intp]:
+        """Returns the signatures sharing a block within radius // m bits of the query"""
+        found: list[NDArray[np.intp]] = []
+        query_array: NDArray[np.uint64] = np.array([query], dtype=np.uint64)
+        for i in range(self.num_blocks):
+            # Every block value close enough to the query's block value
+            nearby: NDArray[np.uint64] = self.block(query_array, i) ^ flip_masks(
+                self.widths[i], radius // self.num_blocks)
+            lows: NDArray[np.intp] = np.searchsorted(self.sorted_values[i], nearby, side="left")
+            highs: NDArray[np.intp] = np.searchsorted(self.sorted_values[i], nearby, side="right")
+            for low, high in zip(lows.tolist(), highs.tolist()):
+                if high > low:
+                    found.append(self.sorted_ids[i][low:high])
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        return np.unique(np.concatenate(found))
+
+    def query(self, query: int, radius: int) -> tuple[NDArray[np.intp], NDArray[np.uint8]]:
+        """Returns the indices and distances of every signature within radius"""
+        ids: NDArray[np.intp] = self.candidates(query, radius)
+        # Check the real distance of the candidates
+        distances: NDArray[np.uint8] = popcount(self.signatures[ids] ^ np.uint64(query))
+        close: NDArray[np.bool_] = distances <= radius
+        return ids[close], distances[close]
+
+    def near_duplicates(self, radius: int) -> NDArray[np.intp]:
+        """Returns an (P, 2) array of index pairs i < j within radius of each other"""
+        pairs: list[NDArray[np.intp]] = []
+        for i, signature in enumerate(self.signatures.tolist()):
+            ids, _ = self.query(signature, radius)
+            ids = ids[ids > i]
+            pairs.append(np.column_stack((np.full(ids.size, i), ids)))
+        return np.concatenate(pairs) if pairs else np.zeros((0, 2), dtype=np.intp)
+
+
+def main() -> None:
+    """Defines an entry point for the function"""
+    rng: np.random.Generator = np.random.default_rng(2016)
+    num_signatures: int = 1_000_000
+    radius: int = 3
+    signatures: NDArray[np.uint64] = rng.integers(0, 2**64, size=num_signatures, dtype=np.uint64)
+    # Plant a near duplicate of the first signature, 2 bits away
+    signatures[-1] = signatures[0] ^ np.uint64(0b101)
+
+    start_time: float = process_time()
+    index: MultiIndexHash = MultiIndexHash(signatures)
+    print(f"Indexed {num_signatures:,} signatures in (sec): {process_time() - start_time:.3f}")
+
+    start_time = process_time()
+    ids, distances = index.query(int(signatures[0]), radius)
+    print(f"Index query within distance {radius}: {ids.tolist()} at {distances.tolist()} "
+          f"(sec): {process_time() - start_time:.4f}")
+
+    start_time = process_time()
+    scan: NDArray[np.uint8] = hamming_distances(signatures[:1], signatures)[0]
+    ids = np.flatnonzero(scan <= radius)
+    print(f"Linear scan within distance {radius}: {ids.tolist()} at {scan[ids].tolist()} "
+          f"(sec): {process_time() - start_time:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,27 @@
 # https://www.w3schools.com/python/python_lists_add.asp
 # https://note.nkmk.me/en/python-int-bit-count/ 
 
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Used to check the size of a file before memory-mapping it
+import os
 # Import the random integer function from the random library.
 from random import randint 
+# Import allows us to count bits in whole arrays of integers at once
+import numpy as np
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Number of 1 bits in every possible byte
+BYTE_WEIGHTS: NDArray[np.uint8] = np.array([bin(i).count("1") for i in range(256)],
+                                           dtype=np.uint8)
+# Number of 64 bit values read from a file at a time
+CHUNK_SIZE: int = 1 << 22
 
 
 def convert_to_binary (number: int) -> list[int]:
@@ -64,6 +83,61 @@ def check_hamming_weight(number: int) -> int:
     """Counts the number of 1 bits in an integer. """
     return bin(number).count('1')
 
+# ---------------------------------------------------------------------------
+# Vectorized population count
+# ---------------------------------------------------------------------------
+# Both methods work on uint64 arrays directly, without building lists of bits.
+# https://en.wikipedia.org/wiki/Hamming_weight#Efficient_implementation
+
+
+def popcount_table(values: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    """Counts the 1 bits of every value by looking up each of its 8 bytes"""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    # View every value as its 8 bytes and add up the weights of the bytes
+    byte_view: NDArray[np.uint8] = values.view(np.uint8).reshape(*values.shape, 8)
+    return BYTE_WEIGHTS[byte_view].sum(axis=-1, dtype=np.uint8)
+
+
+def popcount_swar(values: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    """Counts the 1 bits of every value with the SWAR (SIMD within a register)
+    bit tricks: count pairs of bits, then nibbles, then add the bytes up"""
+    x: NDArray[np.uint64] = np.asarray(values, dtype=np.uint64)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    # Multiplying by 0x0101... adds all 8 byte counts into the top byte
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def popcount(values: NDArray[np.uint64], method: str = "swar") -> NDArray[np.uint8]:
+    """Counts the 1 bits of every value in an array ("swar" or "table" method)"""
+    if method == "swar":
+        return popcount_swar(values)
+    if method == "table":
+        return popcount_table(values)
+    raise ValueError(f"Unknown popcount method {method!r}")
+
+
+def popcount_file(file_name: str, chunk_size: int = CHUNK_SIZE) -> tuple[int, NDArray[np.int64]]:
+    """Counts the 1 bits of a binary file of little-endian uint64 values.
+    Returns the total count and a histogram of the weights 0 to 64."""
+    histogram: NDArray[np.int64] = np.zeros(65, dtype=np.int64)
+    size: int = os.path.getsize(file_name)
+    # An empty file cannot be memory-mapped, and has no bits to count
+    if size == 0:
+        return 0, histogram
+    if size % 8:
+        raise ValueError(f"{file_name} is {size:,} bytes, which is not a whole number of uint64 values")
+    # Memory-map the file, so only one chunk is read in at a time
+    values: NDArray[np.uint64] = np.memmap(file_name, dtype="<u8", mode="r")
+    for start in range(0, values.size, chunk_size):
+        weights: NDArray[np.uint8] = popcount(values[start:start + chunk_size])
+        histogram += np.bincount(weights, minlength=65)
+    # Every value with weight w contributes w bits to the total
+    total: int = int(histogram @ np.arange(65))
+    return total, histogram
+
+
 def main() -> None:
     number: int = 95_601
     # binary is defined as an integer list equal to the result of the conversion function
@@ -72,6 +146,12 @@ def main() -> None:
     check_hamming: int = check_hamming_weight(number)
     print(f"The Hamming weight of {number} is: {result}")
     print(f"Using Python's bit_count(), the hamming weight is: {check_hamming}")
+    # Count a whole array of random 64 bit integers at once
+    values: NDArray[np.uint64] = np.random.default_rng(2016).integers(
+        0, 2**64, size=1_000_000, dtype=np.uint64)
+    weights: NDArray[np.uint8] = popcount(values)
+    print(f"Total Hamming weight of {values.size:,} random 64 bit integers: "
+          f"{int(weights.sum(dtype=np.int64)):,}")
 
 if __name__ == "__main__":
     main()
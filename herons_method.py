@@ -4,40 +4,158 @@
 # This code implements Heron's method for estimating square roots.
 # Code is modified from that given by
 # Dr. David Biersach in herons_formula.py.
+# Heron's method runs on whole NumPy arrays at once and stops on a relative
+# tolerance, which works for large and small numbers alike. Integers get exact
+# integer square roots. Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Methods_of_computing_square_roots
+# https://docs.python.org/3/library/math.html#math.isqrt
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+
+# Imports the typing module to aid with type hints
+import typing
+
+# Used to pick the benchmark from the command line
+import sys
+
+# Import the exact integer and float square root functions
+from math import isqrt, sqrt
 
 # Import the random integer function from the library "random."
 from random import randint
 
-# Import the mean function from the library "numpy."
-from numpy import mean
+# Import process time so we can time the benchmark
+from time import process_time
+
+# Import allows us to update every estimate at once
+import numpy as np
+
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Stop once an update changes the estimate by less than this fraction of it
+REL_TOLERANCE: float = 4 * float(np.finfo(np.float64).eps)
+# Heron's method doubles the correct digits every step, so this is never reached
+# from the starting guess used in heron_sqrt
+MAX_ITERATIONS: int = 100
+
+
+def heron_sqrt(s: NDArray[np.float64], rel_tol: float = REL_TOLERANCE,
+               max_iterations: int = MAX_ITERATIONS) -> tuple[NDArray[np.float64], NDArray[np.int64]]:
+    """Returns the square roots of the values in s and the number of Heron steps each one took"""
+    s = np.asarray(s, dtype=np.float64)
+    root: NDArray[np.float64] = np.full(s.shape, np.nan)
+    iterations: NDArray[np.int64] = np.zeros(s.shape, dtype=np.int64)
+    root[s == 0] = 0.0
+    # Negative and non-finite values keep nan and 0 iterations, infinity is its own root
+    root[s == np.inf] = np.inf
+    valid: NDArray[np.bool_] = (s > 0) & np.isfinite(s)
+    values: NDArray[np.float64] = np.where(valid, s, 1.0)
+    # Write s = m * 2^e with e even and 0.5 <= m < 2, so sqrt(s) = sqrt(m) * 2^(e / 2).
+    # The starting guess (1 + m) / 2 * 2^(e / 2) is within 7% of the root and never
+    # below it, and from above every step moves down towards the root.
+    mantissa, exponent = np.frexp(values)
+    odd: NDArray[np.bool_] = exponent % 2 == 1
+    mantissa[odd] *= 2.0
+    exponent[odd] -= 1
+    x: NDArray[np.float64] = np.ldexp(0.5 * (1.0 + mantissa), exponent // 2)
+    # Every estimate takes a step each iteration, since picking out the unconverged
+    # ones would cost more than the step itself. Only the iteration counts are masked.
+    converged: NDArray[np.bool_] = ~valid
+    for step in range(1, max_iterations + 1):
+        # Heron's update: the mean of x and s / x, without building a list for numpy.mean
+        x_revised: NDArray[np.float64] = 0.5 * (x + values / x)
+        done: NDArray[np.bool_] = np.abs(x_revised - x) <= rel_tol * x_revised
+        iterations[done & ~converged] = step
+        converged |= done
+        x = x_revised
+        if converged.all():
+            break
+    # Whatever has not converged after max_iterations keeps its last estimate
+    iterations[~converged] = max_iterations
+    root[valid] = x[valid]
+    return root, iterations
+
+
+def isqrt_array(n: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Returns the exact integer square roots floor(sqrt(n)) of non-negative integers"""
+    n = np.asarray(n)
+    if n.dtype == object:
+        # Python integers of any size
+        return np.array([isqrt(int(value)) for value in n.ravel()], dtype=object).reshape(n.shape)
+    if np.any(n < 0):
+        raise ValueError("isqrt_array() argument must be nonnegative")
+    values: NDArray[np.uint64] = n.astype(np.uint64)
+    # The float square root is within one of the exact answer, then fix it up with
+    # integer arithmetic. Squares of roots below 2^32 fit in uint64.
+    root: NDArray[np.uint64] = np.floor(np.sqrt(values.astype(np.float64))).astype(np.uint64)
+    root = np.minimum(root, np.uint64(2**32 - 1))
+    root -= (root * root > values).astype(np.uint64)
+    below: NDArray[np.uint64] = root + np.uint64(1)
+    root += ((below < 2**32) & (below * below <= values)).astype(np.uint64)
+    return root.astype(n.dtype)
+
+
+def time_call(function: typing.Callable[[], object]) -> float:
+    """Returns the run time of function in seconds"""
+    start_time: float = process_time()
+    function()
+    return process_time() - start_time
+
+
+def benchmark(num_values: int = 10**7) -> None:
+    """Compares the batched Heron's method with math.sqrt and np.sqrt"""
+    rng: np.random.Generator = np.random.default_rng(2016)
+    # Spread the values over many orders of magnitude
+    s: NDArray[np.float64] = 10.0 ** rng.uniform(-30, 30, size=num_values)
+    print(f"Square roots of {num_values:,} values between 1e-30 and 1e30")
+
+    roots: NDArray[np.float64] = np.sqrt(s)
+    print(f"{'np.sqrt':>16}: run time (sec): {time_call(lambda: np.sqrt(s)):.3f}")
+    values: list[float] = s.tolist()
+    print(f"{'math.sqrt':>16}: run time (sec): {time_call(lambda: [sqrt(v) for v in values]):.3f}")
+    result: list[tuple[NDArray[np.float64], NDArray[np.int64]]] = []
+    elapsed_time: float = time_call(lambda: result.append(heron_sqrt(s)))
+    heron, iterations = result[0]
+    print(f"{'heron_sqrt':>16}: run time (sec): {elapsed_time:.3f}")
+    print(f"  iterations: mean {iterations.mean():.2f}, max {iterations.max()}")
+    print(f"  largest relative difference from np.sqrt: {np.max(np.abs(heron - roots) / roots):.2e}")
+
+    n: NDArray[np.int64] = rng.integers(0, np.iinfo(np.int64).max, size=num_values, dtype=np.int64)
+    print(f"\nInteger square roots of {num_values:,} int64 values")
+    exact: list[NDArray[np.int64]] = []
+    print(f"{'isqrt_array':>16}: run time (sec): {time_call(lambda: exact.append(isqrt_array(n))):.3f}")
+    integers: list[int] = n.tolist()
+    print(f"{'math.isqrt':>16}: run time (sec): {time_call(lambda: [isqrt(v) for v in integers]):.3f}")
+    print(f"  matches math.isqrt on the first 10^5 values: "
+          f"{exact[0][:100_000].tolist() == [isqrt(v) for v in integers[:100_000]]}")
 
 
 def main() -> None:  # Defines an entry point for the function.
     # Defines random integer "s" between 10^6 and 2(10^6) that
     # we will calculate the square root of
     s: float = randint(10**6, 2 * 10**6)
-    # Initial guess of sqrt s
-    x: float = s / 2
-    # What our updated guess for sqrt s will be based on x
-    x_revised = float(mean([s / x, x]))
-    # Calculates the error of the function based on s and x_revised
-    error: float = abs(s - x_revised**2)
-
-    while error > 10**-8:  # While error is greater than the acceptable value (10^-8)
-        x = x_revised  # x is updated based on x_revised
-        # x_revised is updated based on the old value for x_revised.
-        x_revised = float(mean([s / x_revised, x_revised]))
-        # Error is updated based on the old value for x_revised.
-        error = abs(s - x_revised**2)
-
-    r: float = x_revised
+    # Heron's method: repeatedly replace the guess x with the mean of s / x and x,
+    # until the guess changes by less than the relative tolerance.
+    # An absolute error bound like 10^-8 cannot be reached for large s, because
+    # floats only have about 16 significant digits.
+    root, iterations = heron_sqrt(np.array([s]))
+    r: float = float(root[0])
     # Rounds r to 8 digits. Used https://realpython.com/python-rounding/ to find
-    # Sqrt of s is defined as a floating type r, which is equal to the
-    # x_revised that generates an error <10^-8
     r = round(r, 8)
     print(f"The square root of {s:,} is {r:,}")
+    print(f"Heron's method took {iterations[0]} iterations")
+    # Integers of any size have an exact integer square root
+    big: int = 10**40 + 12_345
+    print(f"The integer square root of {big:,} is {isqrt(big):,}")
 
 
 if __name__ == "__main__":
-    # Calls the main function.
-    main()
+    # "herons_method.py --benchmark [number of values]" runs the benchmark instead
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(*(int(arg) for arg in sys.argv[2:3]))
+    else:
+        # Calls the main function.
+        main()
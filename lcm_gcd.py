@@ -4,9 +4,133 @@
 # This code displays the lowest common multiple of 447618 and 2011825.
 # Code is modified from that given by
 # Dr. David Biersach in euclid_gcd.py and coprime_probability.py.
+# It also reduces gcd and lcm over whole arrays of integers with exact integer math,
+# and finds the factors shared between many large moduli with a product tree
+# (batch GCD). Code is aided by the following online resources:
+# https://numpy.org/doc/stable/reference/generated/numpy.gcd.html
+# https://facthacks.cr.yp.to/batchgcd.html
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+
+# Imports the typing module to aid with type hints
+import typing
 
 # imports the function for finding the greatest common factor from the library math
-from math import gcd
+from functools import reduce
+from math import gcd, lcm
+
+# Import allows us to reduce arrays of millions of integers at once
+import numpy as np
+
+# Import the Miller-Rabin test to make primes for the batch GCD example
+from prime_racer4 import is_prime_mr
+
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Largest value an int64 lcm may take before we switch to Python integers
+INT64_MAX: int = int(np.iinfo(np.int64).max)
+
+
+def as_int64(values: typing.Sequence[int] | NDArray[np.int64]) -> NDArray[np.int64] | None:
+    """Returns values as an int64 array, or None if some value does not fit in 64 bits"""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu" and values.dtype != np.uint64:
+        return np.abs(values.astype(np.int64, copy=False))
+    numbers: list[int] = [abs(int(v)) for v in values]
+    if numbers and max(numbers) > INT64_MAX:
+        return None
+    return np.array(numbers, dtype=np.int64)
+
+
+def gcd_array(values: typing.Sequence[int] | NDArray[np.int64]) -> int:
+    """Returns the greatest common divisor of all the values (0 for no values)"""
+    numbers: NDArray[np.int64] | None = as_int64(values)
+    if numbers is None:
+        # Too big for int64: reduce the Python integers
+        return reduce(gcd, (int(v) for v in values), 0)
+    # The gcd never exceeds its inputs, so int64 cannot overflow here
+    return int(np.gcd.reduce(numbers)) if numbers.size else 0
+
+
+def lcm_tree(numbers: list[int]) -> int:
+    """Returns the lcm of Python integers, combining them in pairs so the operands stay balanced"""
+    while len(numbers) > 1:
+        pairs: list[int] = [lcm(x, y) for x, y in zip(numbers[0::2], numbers[1::2])]
+        if len(numbers) % 2:
+            pairs.append(numbers[-1])
+        numbers = pairs
+    return numbers[0] if numbers else 1
+
+
+def lcm_array(values: typing.Sequence[int] | NDArray[np.int64]) -> int:
+    """Returns the lowest common multiple of all the values (1 for no values)"""
+    numbers: NDArray[np.int64] | None = as_int64(values)
+    if numbers is None:
+        return lcm_tree([abs(int(v)) for v in values])
+    if numbers.size == 0:
+        return 1
+    if not numbers.all():
+        # Any multiple of 0 is 0
+        return 0
+    # Combine neighbouring pairs with np.lcm level by level. np.lcm wraps around
+    # silently, so check each level first and hand over to Python integers when
+    # a result would not fit in int64
+    while numbers.size > 1:
+        left: NDArray[np.int64] = numbers[0 : numbers.size - numbers.size % 2 : 2]
+        right: NDArray[np.int64] = numbers[1::2]
+        quotient: NDArray[np.int64] = left // np.gcd(left, right)
+        if np.any(quotient > INT64_MAX // right):
+            return lcm_tree(numbers.tolist())
+        paired: NDArray[np.int64] = quotient * right
+        numbers = np.append(paired, numbers[-1]) if numbers.size % 2 else paired
+    return int(numbers[0])
+
+
+def lcm_pairs(a: NDArray[np.int64], b: NDArray[np.int64]) -> NDArray[np.int64]:
+    """Returns the elementwise lcm of a and b, as Python integers (object array) if int64 would overflow"""
+    a = np.abs(np.asarray(a, dtype=np.int64))
+    b = np.abs(np.asarray(b, dtype=np.int64))
+    greatest: NDArray[np.int64] = np.gcd(a, b)
+    # Dividing first keeps the intermediate values as small as possible
+    quotient: NDArray[np.int64] = np.floor_divide(a, greatest, out=np.zeros_like(a), where=greatest != 0)
+    if np.any(quotient > INT64_MAX // np.maximum(b, 1)):
+        return quotient.astype(object) * b.astype(object)
+    return quotient * b
+
+
+def product_tree(moduli: list[int]) -> list[list[int]]:
+    """Returns the levels of the product tree, from the moduli up to their total product"""
+    tree: list[list[int]] = [moduli]
+    while len(tree[-1]) > 1:
+        level: list[int] = tree[-1]
+        tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                     for i in range(0, len(level), 2)])
+    return tree
+
+
+def batch_gcd(moduli: typing.Sequence[int]) -> list[int]:
+    """Returns gcd(N_i, product of all the other moduli) for every modulus N_i"""
+    # Bernstein's method: reduce the total product P down the tree modulo the
+    # squares of the nodes. At a leaf, (P mod N_i^2) / N_i shares exactly the
+    # factors of N_i that appear in some other modulus.
+    moduli = [int(n) for n in moduli]
+    if not moduli:
+        return []
+    tree: list[list[int]] = product_tree(moduli)
+    remainders: list[int] = tree[-1]
+    for level in reversed(tree[:-1]):
+        remainders = [remainders[i // 2] % (node * node) for i, node in enumerate(level)]
+    return [gcd(remainder // n, n) for remainder, n in zip(remainders, moduli)]
+
+
+def random_prime(bits: int, rng: np.random.Generator) -> int:
+    """Returns a random prime with the given number of bits"""
+    while True:
+        candidate: int = int(rng.integers(1 << (bits - 1), 1 << bits)) | 1
+        if is_prime_mr(candidate):
+            return candidate
 
 
 def main() -> None:  # defines an entry point for the program
@@ -15,11 +139,29 @@ def main() -> None:  # defines an entry point for the program
     greatest = gcd(
         a, b
     )  # The greatest common factor is defined as "greatest" using gcd
-    # The least common factor is equal to the product of two integers divided by the gcd
-    lesser = (a * b) / greatest
+    # The least common factor is equal to the product of two integers divided by the gcd.
+    # Integer division keeps it exact, a float loses digits once a * b passes 2**53.
+    lesser = a * b // greatest
     # Prints a and b and their least common factor.
     print(f"The lowest common multiple of {a:,} and {b:,} is {lesser:,}")
 
+    # gcd and lcm over a million integers at once
+    rng: np.random.Generator = np.random.default_rng(101)
+    values: NDArray[np.int64] = 360 * rng.integers(1, 1_000, size=1_000_000)
+    print(f"\ngcd of {values.size:,} multiples of 360 is {gcd_array(values):,}")
+    print(f"lcm of 1 to 100 is {lcm_array(np.arange(1, 101)):,}")
+
+    # Batch GCD: find the moduli that share a prime with another modulus
+    primes: list[int] = [random_prime(60, rng) for _ in range(200)]
+    moduli: list[int] = [primes[2 * i] * primes[2 * i + 1] for i in range(100)]
+    moduli[10] = primes[20] * primes[7]  # shares a prime with moduli[3]
+    moduli[42] = primes[85] * primes[150]  # shares a prime with moduli[75]
+    shared: list[int] = batch_gcd(moduli)
+    print(f"\nBatch GCD over {len(moduli)} moduli of about 120 bits:")
+    for index, factor in enumerate(shared):
+        if factor != 1:
+            print(f"  moduli[{index}] shares the factor {factor:,}")
+
 
 if __name__ == "__main__":
     # Calls the "main" function.
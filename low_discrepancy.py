@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""low_discrepancy.py"""
+
+# This code generates the quasi-random (low discrepancy) points used by the Monte 
+# Carlo notebooks: Halton (plain or scrambled), Sobol and R2 sequences in any 
+# number of dimensions. Every generator can start at any index and write into a 
+# preallocated float64 buffer, so long sequences can be made a chunk at a time.
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Halton_sequence
+# https://web.maths.unsw.edu.au/~fkuo/sobol/
+# https://extremelearning.com.au/unreasonable-effectiveness-of-quasirandom-sequences/
+
+# Allows for annotations and type hints
+from __future__ import annotations
+
+# Allow for type hints
+import typing
+
+# Used for calculations
+import numpy as np
+
+# Import the sieve to find the prime bases of the Halton sequence
+from prime_racer4 import small_primes
+
+# For type checking
+if typing.TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Bits of precision of the Sobol points
+SOBOL_BITS: int = 32
+
+# Joe-Kuo direction numbers (new-joe-kuo-6.21201) for Sobol dimensions 2 to 10:
+# degree s, coefficients a of the primitive polynomial, initial numbers m_1 .. m_s.
+# Dimension 1 is the van der Corput sequence in base 2.
+SOBOL_DIRECTIONS: tuple[tuple[int, int, tuple[int, ...]], ...] = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+)
+SOBOL_MAX_DIMS: int = len(SOBOL_DIRECTIONS) + 1
+
+
+def first_primes(count: int) -> NDArray[np.int64]:
+    """Returns the first count primes, the bases of a count-dimensional Halton sequence"""
+    limit: int = 16
+    primes: NDArray[np.int64] = small_primes(limit)
+    while primes.size < count:
+        limit *= 2
+        primes = small_primes(limit)
+    return primes[:count]
+
+
+def halton(n: NDArray[np.int64], p: int, permutation: NDArray[np.int64] | None = None,
+           out: NDArray[np.float64] | None = None) -> NDArray[np.float64]:
+    """Returns the radical inverse of the indices n in base p (one Halton coordinate)"""
+    # Same steps as the numba version in the notebooks, one digit of every index at
+    # a time, so the results are identical: h += (n % p) * f with f = f / p, n = n // p
+    n = np.array(n, dtype=np.int64)
+    h: NDArray[np.float64] = np.zeros(n.shape) if out is None else out
+    h.fill(0.0)
+    f: float = 1.0
+    while np.any(n > 0):
+        f = f / p
+        digits: NDArray[np.int64] = n % p
+        # A scrambled sequence replaces each digit through a permutation that keeps 0
+        h += (digits if permutation is None else permutation[digits]) * f
+        n //= p
+    return h
+
+
+def digit_permutations(bases: NDArray[np.int64], seed: int | None = None) -> list[NDArray[np.int64]]:
+    """Returns one random permutation of the digits of each base, leaving 0 in place"""
+    rng: np.random.Generator = np.random.default_rng(seed)
+    return [np.concatenate(([0], 1 + rng.permutation(int(p) - 1))) for p in bases]
+
+
+def output_buffer(num_points: int, dims: int, out: NDArray[np.float64] | None) -> NDArray[np.float64]:
+    """Returns out after checking its shape, or a new (num_points, dims) array"""
+    if out is None:
+        return np.empty((num_points, dims))
+    if out.shape != (num_points, dims) or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape {(num_points, dims)}")
+    return out
+
+
+def halton_points(num_points: int, dims: int, start: int = 0, scramble: bool = False,
+                  seed: int | None = None, out: NDArray[np.float64] | None = None
+                  ) -> NDArray[np.float64]:
+    """Returns Halton points start .. start + num_points - 1 in dims dimensions"""
+    points: NDArray[np.float64] = output_buffer(num_points, dims, out)
+    bases: NDArray[np.int64] = first_primes(dims)
+    # The same seed gives the same permutations, so chunks fit together
+    permutations: list[NDArray[np.int64]] | list[None] = (
+        digit_permutations(bases, seed) if scramble else [None] * dims)
+    indices: NDArray[np.int64] = np.arange(start, start + num_points, dtype=np.int64)
+    column: NDArray[np.float64] = np.empty(num_points)
+    for dim, (p, permutation) in enumerate(zip(bases, permutations)):
+        points[:, dim] = halton(indices, int(p), permutation, column)
+    return points
+
+
+def sobol_directions(dims: int) -> NDArray[np.uint64]:
+    """Returns the (dims, SOBOL_BITS) table of Sobol direction numbers v_j = m_j 2^(SOBOL_BITS - j)"""
+    if dims > SOBOL_MAX_DIMS:
+        raise ValueError(f"Sobol points are available in up to {SOBOL_MAX_DIMS} dimensions")
+    v: NDArray[np.uint64] = np.zeros((dims, SOBOL_BITS), dtype=np.uint64)
+    # The first dimension has every m_j = 1
+    v[0] = [1 << (SOBOL_BITS - 1 - j) for j in range(SOBOL_BITS)]
+    for dim, (s, a, m) in enumerate(SOBOL_DIRECTIONS[: dims - 1], start=1):
+        row: list[int] = [m[j] << (SOBOL_BITS - 1 - j) for j in range(s)]
+        for j in range(s, SOBOL_BITS):
+            # Recurrence from the primitive polynomial x^s + a_1 x^(s-1) + ... + 1
+            value: int = row[j - s] ^ (row[j - s] >> s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    value ^= row[j - k]
+            row.append(value)
+        v[dim] = row
+    return v
+
+
+def sobol_points(num_points: int, dims: int, start: int = 0,
+                 out: NDArray[np.float64] | None = None) -> NDArray[np.float64]:
+    """Returns Sobol points start .. start + num_points - 1 in dims dimensions (Gray code order)"""
+    points: NDArray[np.float64] = output_buffer(num_points, dims, out)
+    v: NDArray[np.uint64] = sobol_directions(dims)
+    indices: NDArray[np.uint64] = np.arange(start, start + num_points, dtype=np.uint64)
+    # Point n is the XOR of the direction numbers picked out by the bits of the
+    # Gray code of n, so any index can be made directly without its predecessors
+    gray: NDArray[np.uint64] = indices ^ (indices >> np.uint64(1))
+    x: NDArray[np.uint64] = np.zeros((num_points, dims), dtype=np.uint64)
+    for j in range(int(gray.max()).bit_length() if num_points else 0):
+        picked: NDArray[np.bool_] = ((gray >> np.uint64(j)) & np.uint64(1)).astype(np.bool_)
+        x[picked] ^= v[:, j]
+    np.multiply(x, 2.0**-SOBOL_BITS, out=points)
+    return points
+
+
+def r2_points(num_points: int, dims: int, start: int = 0, offset: float = 0.5,
+              out: NDArray[np.float64] | None = None) -> NDArray[np.float64]:
+    """Returns points start .. start + num_points - 1 of the R2 (generalized golden ratio) sequence"""
+    points: NDArray[np.float64] = output_buffer(num_points, dims, out)
+    # phi is the positive root of x^(dims + 1) = x + 1, found by fixed point iteration
+    phi: float = 2.0
+    for _ in range(50):
+        phi = (1 + phi) ** (1 / (dims + 1))
+    alpha: NDArray[np.float64] = phi ** -np.arange(1.0, dims + 1)
+    indices: NDArray[np.float64] = np.arange(start, start + num_points, dtype=np.float64)
+    # Reduce n alpha mod 1 before adding the offset to keep the digits for large n
+    np.multiply(indices[:, None], alpha, out=points)
+    points -= np.floor(points)
+    points += offset
+    points %= 1.0
+    return points
+
+
+# Generators by name, each called as generator(num_points, dims, start=..., out=...)
+SEQUENCES: dict[str, typing.Callable[..., NDArray[np.float64]]] = {
+    "halton": halton_points,
+    "sobol": sobol_points,
+    "r2": r2_points,
+}
+
+
+def point_chunks(sequence: str, num_points: int, dims: int, chunk_size: int = 1 << 16,
+                 start: int = 0, **options: typing.Any) -> typing.Iterator[NDArray[np.float64]]:
+    """Yields the points of a sequence a chunk at a time, reusing one buffer"""
+    generator: typing.Callable[..., NDArray[np.float64]] = SEQUENCES[sequence]
+    buffer: NDArray[np.float64] = np.empty((min(chunk_size, num_points), dims))
+    for first in range(start, start + num_points, chunk_size):
+        size: int = min(chunk_size, start + num_points - first)
+        # The buffer is overwritten by the next chunk, so copy anything to keep
+        yield generator(size, dims, start=first, out=buffer[:size], **options)
+
+
+def main() -> None:
+    """Print the first points of each sequence"""
+    np.set_printoptions(precision=4, suppress=True)
+    print(f"Halton base 2: {halton(np.arange(8), 2)}")
+    print(f"Halton base 3: {halton(np.arange(8), 3)}")
+    for name in SEQUENCES:
+        print(f"\n{name}, points 0 to 4 in 3 dimensions:\n{SEQUENCES[name](5, 3)}")
+    print(f"\nscrambled halton, points 0 to 4 in 3 dimensions:\n{halton_points(5, 3, scramble=True, seed=4)}")
+    # The first two dimensions cover the unit square evenly
+    for name in SEQUENCES:
+        total: NDArray[np.float64] = np.zeros(2)
+        for chunk in point_chunks(name, 1_000_000, 2, chunk_size=100_000):
+            total += chunk.sum(axis=0)
+        print(f"{name:>7}: mean of 1,000,000 points made in chunks {total / 1_000_000}")
+
+
+if __name__ == "__main__":
+    main()
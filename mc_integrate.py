@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""mc_integrate.py"""
+
+# This code estimates the area under a curve by Monte Carlo integration, either by
+# hit-or-miss (the fraction of points in a box that fall under the curve) or by 
+# importance sampling (the average of f(x) / g(x) for x drawn from a density g).
+# Points come from a low discrepancy sequence with a random shift per replicate 
+# (randomized quasi-Monte Carlo). The spread of the replicate estimates gives the
+# standard error, and batches grow until it reaches the requested relative error.
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Monte_Carlo_integration
+# https://en.wikipedia.org/wiki/Importance_sampling
+# https://artowen.su.domains/mc/qmcstuff.pdf
+
+# Allows for annotations and type hints
+from __future__ import annotations
+
+# Allow for type hints
+import typing
+
+# Used to hand the batches to the worker processes
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+# Used for calculations
+import numpy as np
+
+# Import the quasi-random points
+from low_discrepancy import SEQUENCES
+
+# For type checking
+if typing.TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# z value of a two sided 95% confidence interval
+Z_95: float = 1.959964
+# Points used to estimate the height of the box when none is given
+HEIGHT_GRID: int = 10_001
+
+Integrand = typing.Callable[["NDArray[np.float64]"], "NDArray[np.float64]"]
+
+
+class MCResult(typing.NamedTuple):
+    estimate: float  # mean of the replicate estimates
+    std_error: float  # standard error of the mean
+    rel_error: float  # std_error / |estimate|
+    num_points: int  # points used by each replicate
+    replicates: int
+    converged: bool  # whether rel_error reached the tolerance
+
+    @property
+    def interval(self) -> tuple[float, float]:
+        """Approximate 95% confidence interval of the estimate"""
+        return self.estimate - Z_95 * self.std_error, self.estimate + Z_95 * self.std_error
+
+
+def shifted_points(sequence: str, num_points: int, dims: int, start: int,
+                   shift: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Returns quasi-random points start .. start + num_points - 1 moved by shift (mod 1)"""
+    points: NDArray[np.float64] = SEQUENCES[sequence](num_points, dims, start=start)
+    points += shift
+    points %= 1.0
+    return points
+
+
+def hit_or_miss_points(f: Integrand, domain: tuple[float, float], height: float,
+                       num_points: int, sequence: str = "sobol", start: int = 0,
+                       shift: NDArray[np.float64] | None = None
+                       ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.bool_]]:
+    """Returns the x and y of points in the box domain x [0, height] and which are under f"""
+    points: NDArray[np.float64] = shifted_points(
+        sequence, num_points, 2, start, np.zeros(2) if shift is None else shift)
+    lo, hi = domain
+    x: NDArray[np.float64] = lo + (hi - lo) * points[:, 0]
+    y: NDArray[np.float64] = height * points[:, 1]
+    return x, y, y <= f(x)
+
+
+def hit_or_miss_sum(f: Integrand, domain: tuple[float, float], height: float, sequence: str,
+                    shift: NDArray[np.float64], start: int, num_points: int) -> float:
+    """Returns the box area times the number of points under f, for one batch"""
+    inside: NDArray[np.bool_] = hit_or_miss_points(f, domain, height, num_points, sequence, start, shift)[2]
+    return (domain[1] - domain[0]) * height * float(np.count_nonzero(inside))
+
+
+def importance_sum(f: Integrand, pdf: Integrand, ppf: Integrand, sequence: str,
+                   shift: NDArray[np.float64], start: int, num_points: int) -> float:
+    """Returns the sum of f(x) / pdf(x) over one batch of x drawn through the inverse cdf ppf"""
+    x: NDArray[np.float64] = ppf(shifted_points(sequence, num_points, 1, start, shift)[:, 0])
+    return float(np.sum(f(x) / pdf(x)))
+
+
+def box_height(f: Integrand, domain: tuple[float, float]) -> float:
+    """Returns a box height just above the largest value of f found on a fine grid"""
+    return 1.01 * float(np.max(f(np.linspace(*domain, HEIGHT_GRID))))
+
+
+def integrate(f: Integrand, domain: tuple[float, float], tol: float = 1e-3,
+              method: str = "hit_or_miss", height: float | None = None,
+              proposal: tuple[Integrand, Integrand] | None = None, sequence: str = "sobol",
+              replicates: int = 16, batch_size: int = 4_096, max_points: int = 1 << 22,
+              num_workers: int = 1, seed: int | None = None) -> MCResult:
+    """Estimates the integral of f over domain to a relative standard error of tol
+
+    method "hit_or_miss" samples the box domain x [0, height], where height must
+    be at least the largest value of f on domain (estimated on a grid if not given).
+    method "importance" samples x from proposal = (pdf, ppf), a density on domain and
+    its inverse cdf, and defaults to the uniform density on domain. Each round runs
+    every replicate on the next batch of the sequence, doubling the points used,
+    until the relative error reaches tol or each replicate has used max_points.
+    With num_workers > 1 the batches run on a process pool, so f (and the proposal)
+    must be picklable: module level functions or partials of them, not lambdas or
+    functions defined inside other functions. num_workers = 1 runs in this process.
+    """
+    dims: int
+    batch_sum: typing.Callable[..., float]
+    if method == "hit_or_miss":
+        dims = 2
+        batch_sum = partial(hit_or_miss_sum, f, domain,
+                            box_height(f, domain) if height is None else height, sequence)
+    elif method == "importance":
+        dims = 1
+        pdf, ppf = proposal if proposal is not None else (
+            partial(uniform_pdf, domain=domain), partial(uniform_ppf, domain=domain))
+        batch_sum = partial(importance_sum, f, pdf, ppf, sequence)
+    else:
+        raise ValueError(f"Unknown method {method!r}, choose 'hit_or_miss' or 'importance'")
+
+    # One random shift per replicate makes each replicate an independent, unbiased
+    # estimate while keeping the even spread of the quasi-random points
+    shifts: NDArray[np.float64] = np.random.default_rng(seed).random((replicates, dims))
+    sums: NDArray[np.float64] = np.zeros(replicates)
+    num_points: int = 0
+    estimate: float = 0.0
+    std_error: float = 0.0
+    rel_error: float = np.inf
+    with ProcessPoolExecutor(num_workers) if num_workers > 1 else nullcontext() as pool:
+        # Run the batches here when there is no pool
+        run_batches: typing.Callable[..., typing.Iterator[float]] = map if pool is None else pool.map
+        while num_points < max_points:
+            # The first batch has batch_size points and every later one as many as all
+            # before it, so each replicate always uses a power of 2 times batch_size
+            # points, which is when Sobol points are most evenly spread
+            size: int = min(max(batch_size, num_points), max_points - num_points)
+            sums += np.fromiter(run_batches(batch_sum, shifts, [num_points] * replicates,
+                                            [size] * replicates), dtype=np.float64, count=replicates)
+            num_points += size
+            estimates: NDArray[np.float64] = sums / num_points
+            estimate = float(estimates.mean())
+            std_error = float(estimates.std(ddof=1) / np.sqrt(replicates))
+            rel_error = std_error / abs(estimate) if estimate else np.inf
+            if rel_error <= tol:
+                break
+    return MCResult(estimate, std_error, rel_error, num_points, replicates, rel_error <= tol)
+
+
+def uniform_pdf(x: NDArray[np.float64], domain: tuple[float, float]) -> NDArray[np.float64]:
+    """Uniform density on domain"""
+    return np.full_like(x, 1 / (domain[1] - domain[0]))
+
+
+def uniform_ppf(u: NDArray[np.float64], domain: tuple[float, float]) -> NDArray[np.float64]:
+    """Inverse cdf of the uniform density on domain"""
+    return domain[0] + (domain[1] - domain[0]) * u
+
+
+def exponential_pdf(x: NDArray[np.float64], rate: float = 1.5) -> NDArray[np.float64]:
+    """Exponential distribution pdf, the example integrand"""
+    return rate * np.exp(-rate * x)
+
+
+def truncated_exponential(x: NDArray[np.float64], rate: float, upper: float) -> NDArray[np.float64]:
+    """Exponential pdf restricted to [0, upper] and scaled to integrate to 1"""
+    return rate * np.exp(-rate * x) / -np.expm1(-rate * upper)
+
+
+def truncated_exponential_ppf(u: NDArray[np.float64], rate: float, upper: float) -> NDArray[np.float64]:
+    """Inverse cdf of truncated_exponential"""
+    return -np.log1p(u * np.expm1(-rate * upper)) / rate
+
+
+def print_result(name: str, result: MCResult, actual: float) -> None:
+    """Print an estimate with its error bar and its true error"""
+    low, high = result.interval
+    print(f"{name:>21}: {result.estimate:.8f} +/- {result.std_error:.1e} "
+          f"(95% CI {low:.8f} to {high:.8f}), {result.num_points * result.replicates:,} points, "
+          f"true rel err {(result.estimate - actual) / actual:.2e}")
+
+
+def main() -> None:
+    """Estimate P(x <= 1 hour) for the exponential distribution with a rate of 1.5 per hour"""
+    rate: float = 1.5
+    f: Integrand = partial(exponential_pdf, rate=rate)
+    actual: float = 1 - np.exp(-rate)
+    print(f"{'Actual area':>21}: {actual:.8f}")
+    print_result("hit-or-miss", integrate(f, (0.0, 1.0), tol=1e-4, height=rate, seed=1), actual)
+    print_result("uniform importance", integrate(f, (0.0, 1.0), tol=1e-6, method="importance", seed=1), actual)
+    # A proposal shaped like f has an almost constant ratio f / g, so it converges fastest
+    proposal: tuple[Integrand, Integrand] = (
+        partial(truncated_exponential, rate=1.0, upper=1.0),
+        partial(truncated_exponential_ppf, rate=1.0, upper=1.0))
+    print_result("exponential importance", integrate(
+        f, (0.0, 1.0), tol=1e-6, method="importance", proposal=proposal, seed=1), actual)
+    print_result("4 worker processes", integrate(
+        f, (0.0, 1.0), tol=2e-5, height=rate, num_workers=4, seed=1), actual)
+
+
+if __name__ == "__main__":
+    main()
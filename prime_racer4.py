@@ -6,13 +6,60 @@
 # This code decreases the runtime of the prime_racer3.py program 
 # provided by Dr. David Biersach.
 
-# Import the square root function.
-from math import sqrt
+# Allows for annotations for variables and return types
+from __future__ import annotations
+# Imports the typing module to aid with type hints
+import typing
+# Used to write benchmark results
+import csv
+import json
+# Used to run the parallel mode on a pool of worker processes
+import os
+import sys
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+# Import the square root functions.
+from math import isqrt, sqrt
+# Used to cut the prime table off at sqrt(n)
+from bisect import bisect_right
 # Import random integer and see functions. 
 from random import randint, seed
+# Used to summarize repeated benchmark timings
+from statistics import median, quantiles
 # Import process time so we can generate an elapsed time for this program.
-from time import process_time
- 
+# perf_counter measures the wall clock time of the parallel mode.
+from time import perf_counter, process_time
+# Import allows us to sieve and look up whole arrays of numbers at once
+import numpy as np
+
+# if the script is type checking
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+# Numbers covered by one sieve segment, this bounds the memory the sieve uses
+SEGMENT_SIZE: int = 1 << 20
+
+# Primes used to weed out most composites before running Miller-Rabin
+TRIAL_PRIMES: tuple[int, ...] = (
+    2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+    53, 59, 61, 67, 71, 73, 79, 83, 89, 97,
+)
+# Witnesses that make Miller-Rabin exact for every 64 bit integer
+WITNESSES_64: tuple[int, ...] = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+# Witnesses that make Miller-Rabin exact below 4,759,123,141 (so all 32 bit integers)
+WITNESSES_32: tuple[int, ...] = (2, 7, 61)
+
+# Samples handed to a worker process at a time in the parallel mode
+CHUNK_SIZE: int = 1_000
+# Rough run times in microseconds, measured with the segment size above: sieving a
+# segment costs a fixed part plus a part per base prime, Miller-Rabin costs a
+# little per sample below 2^32 and more above. They decide, segment by segment,
+# whether the sieve or Miller-Rabin is cheaper for the samples in it.
+SIEVE_SEGMENT_COST: float = 1_200.0
+SIEVE_PRIME_COST: float = 1.5
+MR_COST_32: float = 0.4
+MR_COST_64: float = 5.0
 
 
 def find_primes(min_p: int, max_p: int) -> list[int]:
@@ -37,6 +84,413 @@ def is_prime(n: int, p: list[int]) -> bool:
     
 
 
+# ---------------------------------------------------------------------------
+# Segmented sieve
+# ---------------------------------------------------------------------------
+# The sieve only stores odd numbers (2 is the only even prime), one bit each:
+# bit i of a segment starting at the odd number lo stands for lo + 2i. Sample
+# ranges are sieved one segment at a time, and segments without any samples
+# are skipped, so memory stays bounded by SEGMENT_SIZE however large the range.
+# A segment holding only a few samples would cost far more to sieve than to test
+# those samples directly, so sparse segments are handed to Miller-Rabin instead.
+
+
+def small_primes(limit: int) -> NDArray[np.int64]:
+    """Returns every prime up to and including limit (sieve of Eratosthenes)"""
+    if limit < 2:
+        return np.zeros(0, dtype=np.int64)
+    composite: NDArray[np.bool_] = np.zeros(limit + 1, dtype=np.bool_)
+    composite[:2] = True
+    for factor in range(2, isqrt(limit) + 1):
+        if not composite[factor]:
+            # Multiples below factor^2 were already crossed off by smaller primes
+            composite[factor * factor::factor] = True
+    return np.flatnonzero(~composite).astype(np.int64)
+
+
+def odd_prime_bitset(lo: int, hi: int, base_primes: NDArray[np.int64]) -> NDArray[np.uint8]:
+    """Returns a packed bitset of the odd primes in [lo, hi), where lo is odd.
+    base_primes must hold every prime up to sqrt(hi)."""
+    num_odds: int = max((hi - lo + 1) // 2, 0)
+    is_prime_odd: NDArray[np.bool_] = np.ones(num_odds, dtype=np.bool_)
+    # Skip 2, since the bitset has no even numbers in it
+    for factor in base_primes[base_primes > 2].tolist():
+        if factor * factor >= hi:
+            break
+        # First odd multiple of factor that is at least factor^2 and at least lo
+        start: int = max(factor * factor, (lo + factor - 1) // factor * factor)
+        if start % 2 == 0:
+            start += factor
+        # Odd multiples are 2 * factor apart, which is factor bits in the bitset
+        is_prime_odd[(start - lo) // 2::factor] = False
+    # 1 is odd but not prime
+    if lo == 1 and num_odds:
+        is_prime_odd[0] = False
+    return np.packbits(is_prime_odd, bitorder="little")
+
+
+def is_prime_sieve(samples: NDArray[np.integer],
+                   segment_size: int = SEGMENT_SIZE) -> NDArray[np.bool_]:
+    """Returns True for every sample that is prime, using a segmented sieve"""
+    numbers: NDArray[np.int64] = np.asarray(samples, dtype=np.int64)
+    result: NDArray[np.bool_] = numbers == 2
+    # Only odd samples above 2 can be prime, the rest are already settled
+    odd: NDArray[np.intp] = np.flatnonzero((numbers > 2) & (numbers % 2 == 1))
+    if odd.size == 0:
+        return result
+    # Visit the odd samples in increasing order so each segment is a slice
+    odd = odd[np.argsort(numbers[odd], kind="stable")]
+    values: NDArray[np.int64] = numbers[odd]
+    base_primes: NDArray[np.int64] = small_primes(isqrt(int(values[-1])))
+
+    # Segments start on odd numbers and cover segment_size numbers each
+    segment_size += segment_size % 2
+    first: int = int(values[0])
+    start: int = 0
+    sparse: list[NDArray[np.intp]] = []
+    while start < values.size:
+        lo: int = first + (int(values[start]) - first) // segment_size * segment_size
+        hi: int = lo + segment_size
+        stop: int = int(np.searchsorted(values, hi))
+        sieve_cost: float = (SIEVE_SEGMENT_COST * segment_size / SEGMENT_SIZE
+                             + SIEVE_PRIME_COST * int(np.searchsorted(base_primes, isqrt(hi), "right")))
+        test_cost: float = (stop - start) * (MR_COST_32 if hi <= 1 << 32 else MR_COST_64)
+        if test_cost < sieve_cost:
+            sparse.append(np.arange(start, stop))
+            start = stop
+            continue
+        bits: NDArray[np.uint8] = odd_prime_bitset(lo, hi, base_primes)
+        # Look up the bit of every sample in this segment
+        positions: NDArray[np.int64] = (values[start:stop] - lo) // 2
+        result[odd[start:stop]] = (bits[positions >> 3] >> (positions & 7)) & 1 == 1
+        start = stop
+    if sparse:
+        tested: NDArray[np.intp] = np.concatenate(sparse)
+        result[odd[tested]] = is_prime_miller_rabin(values[tested])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Miller-Rabin
+# ---------------------------------------------------------------------------
+# With a fixed set of witnesses Miller-Rabin gives exact answers, and it needs
+# no table of primes at all. Samples below 2^32 are tested as uint64 arrays
+# (their products still fit in 64 bits), larger samples use Python integers.
+
+
+def is_prime_mr(n: int) -> bool:
+    """Returns True/False if the given number is prime (deterministic Miller-Rabin)"""
+    if n < 2:
+        return False
+    # Trial division by small primes settles most numbers straight away
+    for factor in TRIAL_PRIMES:
+        if n % factor == 0:
+            return n == factor
+    # Write n - 1 as d * 2^s with d odd
+    d: int = n - 1
+    s: int = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for witness in WITNESSES_64:
+        x: int = pow(witness, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            # The witness proves n is composite
+            return False
+    return True
+
+
+def pow_mod(base: int, exponent: NDArray[np.uint64], modulus: NDArray[np.uint64]) -> NDArray[np.uint64]:
+    """Returns base^exponent mod modulus for arrays of moduli below 2^32"""
+    result: NDArray[np.uint64] = np.ones_like(modulus)
+    power: NDArray[np.uint64] = np.uint64(base) % modulus
+    exponent = exponent.copy()
+    # Square-and-multiply, one bit of every exponent at a time
+    while exponent.any():
+        odd: NDArray[np.bool_] = (exponent & np.uint64(1)) == 1
+        result = np.where(odd, result * power % modulus, result)
+        power = power * power % modulus
+        exponent >>= np.uint64(1)
+    return result
+
+
+def miller_rabin_32(n: NDArray[np.uint64]) -> NDArray[np.bool_]:
+    """Returns True for every prime in an array of odd numbers between 100 and 2^32"""
+    if n.size == 0:
+        return np.zeros(n.shape, dtype=np.bool_)
+    one: np.uint64 = np.uint64(1)
+    # Write n - 1 as d * 2^s with d odd, for every element at once
+    d: NDArray[np.uint64] = n - one
+    s: NDArray[np.uint64] = np.zeros_like(n)
+    even: NDArray[np.bool_] = (d & one) == 0
+    while even.any():
+        d = np.where(even, d >> one, d)
+        s += even
+        even = (d & one) == 0
+
+    prime: NDArray[np.bool_] = np.ones(n.shape, dtype=np.bool_)
+    for witness in WITNESSES_32:
+        x: NDArray[np.uint64] = pow_mod(witness, d, n)
+        passed: NDArray[np.bool_] = (x == one) | (x == n - one)
+        for r in range(1, int(s.max())):
+            x = x * x % n
+            passed |= (r < s) & (x == n - one)
+        prime &= passed
+    return prime
+
+
+def is_prime_miller_rabin(samples: NDArray[np.integer]) -> NDArray[np.bool_]:
+    """Returns True for every sample that is prime, using deterministic Miller-Rabin"""
+    if np.size(samples) and np.min(samples) < 0:
+        raise ValueError("Samples must not be negative")
+    numbers: NDArray[np.uint64] = np.asarray(samples).astype(np.uint64)
+    result: NDArray[np.bool_] = np.isin(numbers, TRIAL_PRIMES)
+
+    # Pre-filter: drop 0, 1 and every multiple of a small prime
+    trial: NDArray[np.uint64] = np.array(TRIAL_PRIMES, dtype=np.uint64)
+    candidates: NDArray[np.bool_] = numbers > trial[-1]
+    for factor in trial:
+        candidates &= numbers % factor != 0
+
+    small: NDArray[np.intp] = np.flatnonzero(candidates & (numbers < np.uint64(1 << 32)))
+    if small.size:
+        result[small] = miller_rabin_32(numbers[small])
+    for i in np.flatnonzero(candidates & (numbers >= np.uint64(1 << 32))).tolist():
+        result[i] = is_prime_mr(int(numbers[i]))
+    return result
+
+
+# Batch primality tests that callers can choose between
+# Every test takes any integer array and returns a boolean array of the same shape
+PRIMALITY_TESTS: dict[str, typing.Callable[[NDArray[np.integer]], NDArray[np.bool_]]] = {
+    "sieve": is_prime_sieve,
+    "miller_rabin": is_prime_miller_rabin,
+}
+
+
+def is_prime_batch(samples: NDArray[np.integer], method: str = "sieve") -> NDArray[np.bool_]:
+    """Returns True for every prime sample, using the chosen method"""
+    if method not in PRIMALITY_TESTS:
+        raise ValueError(f"Unknown method {method!r}, choose from {list(PRIMALITY_TESTS)}")
+    return PRIMALITY_TESTS[method](samples)
+
+
+# ---------------------------------------------------------------------------
+# Parallel mode
+# ---------------------------------------------------------------------------
+# The samples are split into chunks that a pool of worker processes trial
+# divide by the small-prime table. The table is put in shared memory once and
+# every worker maps it, instead of a copy being pickled along with each chunk.
+
+
+class WorkerReport(typing.NamedTuple):
+    """Work done by one worker process in the parallel mode"""
+    pid: int
+    num_samples: int
+    num_primes: int
+    elapsed_time: float
+
+
+# Small-prime table of the current worker, attached by attach_prime_table
+_shared_table: SharedMemory | None = None
+_shared_primes: NDArray[np.int64] | None = None
+
+
+def attach_prime_table(name: str, length: int) -> None:
+    """Maps the shared small-prime table into a worker process"""
+    global _shared_table, _shared_primes
+    _shared_table = SharedMemory(name=name)
+    _shared_primes = np.ndarray((length,), dtype=np.int64, buffer=_shared_table.buf)
+
+
+def count_chunk(chunk: NDArray[np.int64]) -> WorkerReport:
+    """Counts the primes in one chunk of samples using the shared table"""
+    start_time: float = process_time()
+    assert _shared_primes is not None
+    # Same test as is_prime, for every sample of the chunk at once
+    prime: NDArray[np.bool_] = (chunk[:, None] % _shared_primes != 0).all(axis=1)
+    num_primes: int = int(np.count_nonzero(prime))
+    return WorkerReport(os.getpid(), chunk.size, num_primes, process_time() - start_time)
+
+
+def count_primes_parallel(samples: NDArray[np.int64], p: list[int], num_workers: int,
+                          chunk_size: int = CHUNK_SIZE) -> tuple[int, float, list[WorkerReport]]:
+    """Counts the primes among the samples on a pool of worker processes and
+    returns the count, the wall clock time and one report per worker"""
+    samples = np.asarray(samples, dtype=np.int64)
+    table: SharedMemory = SharedMemory(create=True, size=max(len(p), 1) * 8)
+    try:
+        np.ndarray((len(p),), dtype=np.int64, buffer=table.buf)[:] = p
+        chunks: list[NDArray[np.int64]] = [
+            samples[start:start + chunk_size] for start in range(0, samples.size, chunk_size)]
+
+        start_time: float = perf_counter()
+        totals: dict[int, WorkerReport] = {}
+        with Pool(num_workers, initializer=attach_prime_table,
+                  initargs=(table.name, len(p))) as pool:
+            for report in pool.imap_unordered(count_chunk, chunks):
+                # Add the chunk to the running totals of the worker that did it
+                done: WorkerReport = totals.get(report.pid, WorkerReport(report.pid, 0, 0, 0.0))
+                totals[report.pid] = WorkerReport(
+                    report.pid,
+                    done.num_samples + report.num_samples,
+                    done.num_primes + report.num_primes,
+                    done.elapsed_time + report.elapsed_time,
+                )
+        elapsed_time: float = perf_counter() - start_time
+    finally:
+        table.close()
+        table.unlink()
+
+    workers: list[WorkerReport] = sorted(totals.values())
+    return sum(worker.num_primes for worker in workers), elapsed_time, workers
+
+
+def print_parallel_report(num_primes: int, elapsed_time: float,
+                          workers: list[WorkerReport]) -> None:
+    """Prints the throughput of every worker and of the whole run"""
+    for worker in workers:
+        rate: float = worker.num_samples / worker.elapsed_time if worker.elapsed_time else 0.0
+        print(f"Worker {worker.pid}: {worker.num_samples:,} samples, "
+              f"{worker.num_primes:,} primes, run time (sec): {worker.elapsed_time:.3f} "
+              f"({rate:,.0f} samples/sec)")
+    num_samples: int = sum(worker.num_samples for worker in workers)
+    print(f"Number of primes found: {num_primes:,}")
+    print(f"Total run time (sec): {elapsed_time:.3f} "
+          f"({num_samples / elapsed_time:,.0f} samples/sec)\n")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark harness
+# ---------------------------------------------------------------------------
+# Every strategy counts the primes among the same seeded samples, timed with
+# process_time exactly like main(). Each (strategy, sample count, value range)
+# case is repeated and summarized by its median and interquartile range (IQR),
+# and the results are written to CSV and JSON so runs can be compared later.
+
+
+def count_trial_division(samples: list[int]) -> int:
+    """Counts primes the way main() does: a table of primes up to sqrt(max),
+    then trial division of every sample"""
+    p: list[int] = find_primes(2, isqrt(max(samples)) + 1)
+    # Only divisors up to sqrt(n) count, otherwise a prime in the table would
+    # divide itself and be counted as composite
+    return sum(n > 1 and is_prime(n, p[:bisect_right(p, isqrt(n))]) for n in samples)
+
+
+def count_trial_numpy(samples: list[int]) -> int:
+    """Counts primes by trial dividing all samples by the prime table at once"""
+    values: NDArray[np.int64] = np.array(samples, dtype=np.int64)
+    p: NDArray[np.int64] = small_primes(isqrt(int(values.max())))
+    prime: NDArray[np.bool_] = values > 1
+    # One row of the table at a time keeps memory at one array of samples.
+    # A factor only rules out samples of at least factor^2, so the primes in the
+    # table are not counted as composite
+    for factor in p.tolist():
+        prime &= (values % factor != 0) | (values < factor * factor)
+    return int(np.count_nonzero(prime))
+
+
+def count_sieve(samples: list[int]) -> int:
+    """Counts primes with the segmented sieve"""
+    return int(np.count_nonzero(is_prime_sieve(np.array(samples, dtype=np.int64))))
+
+
+def count_miller_rabin(samples: list[int]) -> int:
+    """Counts primes with deterministic Miller-Rabin"""
+    return int(np.count_nonzero(is_prime_miller_rabin(np.array(samples, dtype=np.uint64))))
+
+
+# Strategies the benchmark races against each other
+BENCHMARK_STRATEGIES: dict[str, typing.Callable[[list[int]], int]] = {
+    "trial_division": count_trial_division,
+    "trial_numpy": count_trial_numpy,
+    "sieve": count_sieve,
+    "miller_rabin": count_miller_rabin,
+}
+
+
+class BenchmarkResult(typing.NamedTuple):
+    """Timings of one strategy on one sample count and value range"""
+    strategy: str
+    num_samples: int
+    min_val: int
+    max_val: int
+    repeats: int
+    num_primes: int
+    median_time: float
+    iqr_time: float
+
+
+def time_strategy(name: str, samples: list[int], repeats: int) -> tuple[int, list[float]]:
+    """Runs one strategy several times and returns its count and run times"""
+    times: list[float] = []
+    counts: set[int] = set()
+    for _ in range(repeats):
+        start_time: float = process_time()
+        counts.add(BENCHMARK_STRATEGIES[name](samples))
+        times.append(process_time() - start_time)
+    if len(counts) > 1:
+        raise RuntimeError(f"{name} counted {sorted(counts)} primes in repeated runs on the same samples")
+    return counts.pop(), times
+
+
+def run_benchmark(sample_counts: list[int], value_ranges: list[tuple[int, int]],
+                  repeats: int = 5, strategies: list[str] | None = None) -> list[BenchmarkResult]:
+    """Times every strategy on every combination of sample count and value range"""
+    results: list[BenchmarkResult] = []
+    for num_samples in sample_counts:
+        for min_val, max_val in value_ranges:
+            # Every strategy gets the same samples
+            seed(2016)
+            samples: list[int] = [randint(min_val, max_val) for _ in range(num_samples)]
+            expected: tuple[str, int] | None = None
+            for name in strategies or list(BENCHMARK_STRATEGIES):
+                num_primes, times = time_strategy(name, samples, repeats)
+                # Every strategy must agree before its timing is recorded
+                if expected is None:
+                    expected = (name, num_primes)
+                elif num_primes != expected[1]:
+                    raise RuntimeError(
+                        f"{name} counted {num_primes:,} primes but {expected[0]} counted "
+                        f"{expected[1]:,} in {num_samples:,} samples in [{min_val:,}, {max_val:,}]")
+                # quantiles needs two points, a single run has no spread
+                quartiles: list[float] = quantiles(times, n=4) if repeats > 1 else [times[0]] * 3
+                results.append(BenchmarkResult(name, num_samples, min_val, max_val, repeats,
+                                               num_primes, median(times),
+                                               quartiles[2] - quartiles[0]))
+                print(f"{name:>15}: {num_samples:>9,} samples in [{min_val:,}, {max_val:,}]"
+                      f"  primes {num_primes:>7,}  median (sec): {median(times):.4f}"
+                      f"  IQR (sec): {quartiles[2] - quartiles[0]:.4f}")
+    return results
+
+
+def write_results(results: list[BenchmarkResult], base_name: str) -> None:
+    """Writes the benchmark results to base_name.csv and base_name.json"""
+    with open(f"{base_name}.csv", "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(BenchmarkResult._fields)
+        writer.writerows(results)
+    with open(f"{base_name}.json", "w") as json_file:
+        json.dump([result._asdict() for result in results], json_file, indent=2)
+
+
+def benchmark(base_name: str = "prime_racer_benchmark") -> None:
+    """Runs the default sweep and saves the results"""
+    results: list[BenchmarkResult] = run_benchmark(
+        sample_counts=[1_000, 10_000],
+        value_ranges=[(100_000, 1_000_000), (1_000_000, 100_000_000)],
+    )
+    write_results(results, base_name)
+    print(f"Results written to {base_name}.csv and {base_name}.json")
+
+
 def main() -> None:
     # Identifying the seed value for the random number generator.
     seed(2016)
@@ -70,8 +524,38 @@ def main() -> None:
     # Print elapsed_time with floating point decimals to 3 places.
     print(f"Number of primes found: {num_primes:,}")
     print(f"Total run time (sec): {elapsed_time:.3f}\n")
+
+    # Repeat the count with the segmented sieve
+    print("Counting again with a segmented sieve . . .")
+    start_time = process_time()
+    num_primes = int(np.count_nonzero(is_prime_sieve(np.array(samples))))
+    elapsed_time = process_time() - start_time
+    print(f"Number of primes found: {num_primes:,}")
+    print(f"Total run time (sec): {elapsed_time:.3f}\n")
+
+    # Repeat the count with Miller-Rabin
+    print("Counting again with Miller-Rabin . . .")
+    start_time = process_time()
+    num_primes = int(np.count_nonzero(is_prime_batch(np.array(samples), "miller_rabin")))
+    elapsed_time = process_time() - start_time
+    print(f"Number of primes found: {num_primes:,}")
+    print(f"Total run time (sec): {elapsed_time:.3f}\n")
+
+    # Repeat the count on 1 up to all of the cores
+    num_cores: int = os.cpu_count() or 1
+    worker_counts: list[int] = sorted(
+        {2 ** i for i in range(num_cores.bit_length()) if 2 ** i <= num_cores} | {num_cores})
+    for num_workers in worker_counts:
+        print(f"Counting again with {num_workers} worker process(es) . . .")
+        num_primes, elapsed_time, workers = count_primes_parallel(
+            np.array(samples), p, num_workers)
+        print_parallel_report(num_primes, elapsed_time, workers)
     
 
 
 if __name__ == "__main__":
-    main()
+    # "prime_racer4.py --benchmark [base name]" runs the benchmark sweep instead
+    if sys.argv[1:2] == ["--benchmark"]:
+        benchmark(*sys.argv[2:3])
+    else:
+        main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""sampling.py"""
+
+# This code draws samples from a probability distribution by inverting its cdf: 
+# if u is uniform on [0, 1) then x = ppf(u), the inverse of the cdf at u, follows 
+# the distribution. The analytic inverse is used where there is one, otherwise 
+# the cdf is tabulated on a grid and inverted by interpolation. Every sample is 
+# used, unlike rejection sampling which throws points away. 
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Inverse_transform_sampling
+# https://en.wikipedia.org/wiki/Binomial_proportion_confidence_interval
+
+# Allows for annotations and type hints
+from __future__ import annotations
+
+# Allow for type hints
+import typing
+
+# Used to build the interpolated inverse cdf
+from functools import partial
+
+# Used to time the samplers
+from time import perf_counter
+
+# Used for calculations
+import numpy as np
+
+# Import the Halton points used by the rejection approach in particle_location.ipynb
+from low_discrepancy import halton
+
+# For type checking
+if typing.TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Samples drawn at a time, this bounds the memory used for any number of samples
+BATCH_SIZE: int = 1 << 20
+# Grid points used to tabulate a cdf
+TABLE_SIZE: int = 1 << 14
+# z value of a two sided 95% confidence interval
+Z_95: float = 1.959964
+# Decay rate of the particle's pdf 2e^(-2x) in particle_location.ipynb
+PARTICLE_RATE: float = 2.0
+
+Distribution = typing.Callable[["NDArray[np.float64]"], "NDArray[np.float64]"]
+
+
+class IntervalEstimate(typing.NamedTuple):
+    probability: float  # fraction of the samples inside the interval
+    std_error: float  # binomial standard error sqrt(p (1 - p) / n)
+    num_samples: int
+
+    @property
+    def interval(self) -> tuple[float, float]:
+        """Approximate 95% confidence interval of the probability"""
+        return self.probability - Z_95 * self.std_error, self.probability + Z_95 * self.std_error
+
+
+def particle_pdf(x: NDArray[np.float64]) -> NDArray[np.float64]:
+    """pdf |psi(x)|^2 = 2e^(-2x) of the particle, x >= 0 in nm"""
+    return PARTICLE_RATE * np.exp(-PARTICLE_RATE * x)
+
+
+def particle_cdf(x: NDArray[np.float64]) -> NDArray[np.float64]:
+    """cdf 1 - e^(-2x) of the particle"""
+    return -np.expm1(-PARTICLE_RATE * x)
+
+
+def particle_ppf(u: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Analytic inverse of particle_cdf"""
+    return -np.log1p(-u) / PARTICLE_RATE
+
+
+def interpolated_ppf(u: NDArray[np.float64], xp: NDArray[np.float64],
+                     fp: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Inverse cdf read off a table of cdf values xp at the grid points fp"""
+    return np.asarray(np.interp(u, xp, fp), dtype=np.float64)
+
+
+def tabulated_ppf(cdf: Distribution, domain: tuple[float, float],
+                  num_points: int = TABLE_SIZE) -> Distribution:
+    """Returns an inverse cdf made by interpolating cdf tabulated over domain
+
+    The cdf is rescaled to run from 0 to 1 across domain, so domain should hold
+    all but a negligible part of the probability.
+    """
+    grid: NDArray[np.float64] = np.linspace(*domain, num_points)
+    table: NDArray[np.float64] = cdf(grid)
+    table = (table - table[0]) / (table[-1] - table[0])
+    # Rounding must not make the table decrease anywhere
+    table = np.maximum.accumulate(table)
+    # Where the cdf is flat the density is 0. Keep only the first and last grid point
+    # of each flat stretch, so interpolation jumps straight across it: u just below
+    # the flat value maps to its start, and u just above to its end
+    keep: NDArray[np.bool_] = np.ones(num_points, dtype=np.bool_)
+    keep[1:-1] = (table[1:-1] != table[:-2]) | (table[1:-1] != table[2:])
+    # Below 0 and above 1 np.interp returns the end values, so the flat stretch at 0
+    # keeps only its last point and the one at 1 only its first
+    keep[: int(np.searchsorted(table, 0.0, "right")) - 1] = False
+    keep[int(np.searchsorted(table, 1.0, "left")) + 1 :] = False
+    return partial(interpolated_ppf, xp=table[keep], fp=grid[keep])
+
+
+def sample_batches(ppf: Distribution, num_samples: int, seed: int | None = None,
+                   batch_size: int = BATCH_SIZE) -> typing.Iterator[NDArray[np.float64]]:
+    """Yields num_samples draws from the distribution with inverse cdf ppf, a batch at a time"""
+    rng: np.random.Generator = np.random.default_rng(seed)
+    for start in range(0, num_samples, batch_size):
+        yield ppf(rng.random(min(batch_size, num_samples - start)))
+
+
+def sample(ppf: Distribution, num_samples: int, seed: int | None = None) -> NDArray[np.float64]:
+    """Returns num_samples draws from the distribution with inverse cdf ppf"""
+    return ppf(np.random.default_rng(seed).random(num_samples))
+
+
+def interval_probability(ppf: Distribution, lo: float, hi: float, num_samples: int,
+                         seed: int | None = None, batch_size: int = BATCH_SIZE) -> IntervalEstimate:
+    """Estimates P(lo <= x <= hi) from num_samples draws, with a binomial error bar"""
+    hits: int = 0
+    for x in sample_batches(ppf, num_samples, seed, batch_size):
+        hits += int(np.count_nonzero((lo <= x) & (x <= hi)))
+    p: float = hits / num_samples
+    return IntervalEstimate(p, float(np.sqrt(p * (1 - p) / num_samples)), num_samples)
+
+
+def rejection_probability(num_samples: int) -> float:
+    """The rejection estimate of P(1 <= x <= 3) from particle_location.ipynb, for comparison"""
+    # Halton x scaled to [0, 3] and clipped to [1, 3], Halton y in [0, 1], and the
+    # fraction of points under the pdf taken as the probability
+    indices: NDArray[np.int64] = np.arange(num_samples)
+    x: NDArray[np.float64] = np.clip(halton(indices, 2) * 3.0, 1, 3.0)
+    y: NDArray[np.float64] = halton(indices, 3)
+    return np.count_nonzero(particle_pdf(x) - y >= 0.0) / num_samples
+
+
+def benchmark(sample_counts: tuple[int, ...] = (10**4, 10**5, 10**6, 10**7)) -> None:
+    """Compares inverse cdf sampling with the rejection approach on P(1 <= x <= 3)"""
+    actual: float = float(particle_cdf(np.asarray(3.0)) - particle_cdf(np.asarray(1.0)))
+    table_ppf: Distribution = tabulated_ppf(particle_cdf, (0.0, 20.0))
+    methods: dict[str, typing.Callable[[int], float]] = {
+        "rejection (clipped)": rejection_probability,
+        "inverse cdf (analytic)": lambda n: interval_probability(particle_ppf, 1.0, 3.0, n, seed=1).probability,
+        "inverse cdf (table)": lambda n: interval_probability(table_ppf, 1.0, 3.0, n, seed=1).probability,
+    }
+    print(f"P(1 <= x <= 3) for the pdf 2e^(-2x), actual {actual:.6f}\n")
+    print(f"{'method':>22} {'samples':>12} {'samples/sec':>14} {'estimate':>10} "
+          f"{'rel err':>10} {'rel err * sqrt(n)':>18}")
+    for num_samples in sample_counts:
+        for name, method in methods.items():
+            start_time: float = perf_counter()
+            estimate: float = method(num_samples)
+            elapsed_time: float = perf_counter() - start_time
+            rel_error: float = abs(estimate - actual) / actual
+            # The error times sqrt(n) is about constant for an unbiased sampler, so it
+            # measures the error each sample contributes; it grows if the estimate is biased
+            print(f"{name:>22} {num_samples:>12,} {num_samples / elapsed_time:>14,.0f} "
+                  f"{estimate:>10.6f} {rel_error:>10.2e} {rel_error * np.sqrt(num_samples):>18.3f}")
+
+
+def main() -> None:
+    """Estimate the probability the particle is found between 1 nm and 3 nm"""
+    actual: float = float(particle_cdf(np.asarray(3.0)) - particle_cdf(np.asarray(1.0)))
+    result: IntervalEstimate = interval_probability(particle_ppf, 1.0, 3.0, 10**6, seed=2016)
+    low, high = result.interval
+    print(f"P(1 <= x <= 3) = {result.probability:.6f} +/- {result.std_error:.6f} "
+          f"(95% CI {low:.6f} to {high:.6f}), actual {actual:.6f}\n")
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
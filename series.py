@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""series.py"""
+
+# This code evaluates the sums used by sum_squares.py and sum_multiples.py in closed 
+# form: sums of powers of the first n natural numbers (Faulhaber's formula) and sums 
+# of the multiples of a set of divisors (inclusion-exclusion). NumPy prefix sums 
+# give the same sums for every n in a range at once. 
+# Code is aided by the following online resources:
+# https://en.wikipedia.org/wiki/Faulhaber%27s_formula
+# https://en.wikipedia.org/wiki/Bernoulli_number
+# https://en.wikipedia.org/wiki/Inclusion%E2%80%93exclusion_principle
+
+# Allows for annotations for variables and return types
+from __future__ import annotations
+
+# Imports the typing module to aid with type hints
+import typing
+
+# Used for exact Bernoulli numbers and the subsets of the divisors
+from fractions import Fraction
+from functools import lru_cache
+from itertools import combinations
+from math import comb, lcm
+
+# Import process time so we can time the closed forms against the loops
+from time import process_time
+
+# Import allows us to build the sums for every n at once
+import numpy as np
+
+if typing.TYPE_CHECKING:
+    # Allows us to use arrays
+    from numpy.typing import NDArray
+
+
+@lru_cache(maxsize=None)
+def bernoulli(m: int) -> Fraction:
+    """Returns the Bernoulli number B_m, with B_1 = +1/2"""
+    # From sum over k of C(m + 1, k) B_k = m + 1 (the B_1 = +1/2 convention)
+    if m == 0:
+        return Fraction(1)
+    total: Fraction = sum((comb(m + 1, k) * bernoulli(k) for k in range(m)), Fraction(0))
+    return (m + 1 - total) / (m + 1)
+
+
+def power_sum(n: int, p: int) -> int:
+    """Returns 1^p + 2^p + ... + n^p exactly, using Faulhaber's formula"""
+    # sum = 1/(p + 1) * sum over j of C(p + 1, j) B_j n^(p + 1 - j)
+    total: Fraction = sum(
+        (comb(p + 1, j) * bernoulli(j) * n ** (p + 1 - j) for j in range(p + 1)), Fraction(0)
+    )
+    return int(total / (p + 1))
+
+
+def triangular(n: int) -> int:
+    """Returns 1 + 2 + ... + n"""
+    return n * (n + 1) // 2
+
+
+def sum_of_multiples(limit: int, divisors: tuple[int, ...], mode: str = "any") -> int:
+    """Returns the sum of the natural numbers up to and including limit that are
+    divisible by any of the divisors (mode "any") or by all of them (mode "all")"""
+    if mode == "all":
+        # Divisible by all of them means divisible by their lowest common multiple
+        step: int = lcm(*divisors)
+        return step * triangular(limit // step)
+    if mode != "any":
+        raise ValueError(f"Unknown mode {mode!r}, choose 'any' or 'all'")
+    # Add the multiples of every single divisor, subtract those counted twice,
+    # add back those counted three times, and so on
+    total: int = 0
+    for size in range(1, len(divisors) + 1):
+        for subset in combinations(divisors, size):
+            step = lcm(*subset)
+            total += (-1) ** (size + 1) * step * triangular(limit // step)
+    return total
+
+
+def power_sum_table(n: int, p: int) -> NDArray[np.int64]:
+    """Returns the array of power sums 1^p + ... + k^p for every k from 0 to n"""
+    # Use Python integers when the largest sum does not fit in 64 bits
+    dtype: type = np.int64 if power_sum(n, p) <= np.iinfo(np.int64).max else object
+    terms: NDArray[np.int64] = np.arange(n + 1, dtype=dtype) ** p
+    terms[0] = 0
+    return np.cumsum(terms)
+
+
+def multiples_table(limit: int, divisors: tuple[int, ...], mode: str = "any") -> NDArray[np.int64]:
+    """Returns the array of sum_of_multiples(k, divisors, mode) for every k from 0 to limit"""
+    numbers: NDArray[np.int64] = np.arange(limit + 1, dtype=np.int64)
+    divisible: NDArray[np.bool_] = np.zeros(limit + 1, dtype=np.bool_) if mode == "any" \
+        else np.ones(limit + 1, dtype=np.bool_)
+    for divisor in divisors:
+        if mode == "any":
+            divisible |= numbers % divisor == 0
+        else:
+            divisible &= numbers % divisor == 0
+    divisible[0] = False
+    return np.cumsum(np.where(divisible, numbers, 0))
+
+
+# ---------------------------------------------------------------------------
+# Micro-benchmark
+# ---------------------------------------------------------------------------
+# The loops below do the same work as main() in sum_squares.py and
+# sum_multiples.py, so the closed forms can be timed against them.
+
+
+def loop_sum_squares(num_terms: int) -> float:
+    """Sum of squares the way sum_squares.py does it: sigma for every n up to num_terms"""
+    series_sum: float = 0.0
+    for n in range(0, num_terms + 1):
+        series_sum = 0.0
+        for k in range(1, n + 1):
+            series_sum += k**2
+    return series_sum
+
+
+def loop_sum_multiples(limit: int) -> int:
+    """Sum of multiples of 7 and 11 the way sum_multiples.py does it"""
+    return sum(n for n in range(1, limit + 1) if n % 7 == 0 and n % 11 == 0)
+
+
+def time_call(function: typing.Callable[[], object], repeats: int = 5) -> float:
+    """Returns the fastest of several run times of function"""
+    times: list[float] = []
+    for _ in range(repeats):
+        start_time: float = process_time()
+        function()
+        times.append(process_time() - start_time)
+    return min(times)
+
+
+def main() -> None:
+    """Time the closed forms and prefix sums against the loops"""
+    num_terms: int = 1000
+    limit: int = 1900
+    print(f"Sum of first {num_terms} natural numbers squared: {power_sum(num_terms, 2):,}")
+    print(f"Sum of numbers divisible by 7 and 11 up to {limit}: "
+          f"{sum_of_multiples(limit, (7, 11), 'all'):,}\n")
+
+    cases: dict[str, typing.Callable[[], object]] = {
+        "sum of squares, loop": lambda: loop_sum_squares(num_terms),
+        "sum of squares, Faulhaber": lambda: power_sum(num_terms, 2),
+        "sum of squares, prefix sums": lambda: power_sum_table(num_terms, 2),
+        "sum of multiples, loop": lambda: loop_sum_multiples(limit),
+        "sum of multiples, inclusion-exclusion": lambda: sum_of_multiples(limit, (7, 11), "all"),
+        "sum of multiples, prefix sums": lambda: multiples_table(limit, (7, 11), "all"),
+    }
+    for name, function in cases.items():
+        print(f"{name:>38}: run time (sec): {time_call(function):.6f}")
+
+
+if __name__ == "__main__":
+    main()
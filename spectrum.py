@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""spectrum.py"""
+
+# This code computes the discrete Fourier transform used in unknown_wave.ipynb. 
+# It returns the same a_cos / b_sin amplitudes as the loop in that notebook. 
+# Evenly spaced samples over one period go through np.fft.rfft in O(N log N).
+# Any other time stamps use an explicit DFT built from whole arrays instead of 
+# a double loop over scalars.
+# Code is aided by the following online resources:
+# https://numpy.org/doc/stable/reference/generated/numpy.fft.rfft.html
+# https://en.wikipedia.org/wiki/Discrete_Fourier_transform
+
+# Allows for annotations and type hints
+from __future__ import annotations
+
+# Allow for type hints
+import typing
+
+# Used to find file sizes, read CSV files a block of lines at a time and
+# write the streaming demo files
+import os
+import tempfile
+from itertools import islice
+
+# Used for calculations
+import numpy as np
+
+# For type checking
+if typing.TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+# Largest number of cos/sin values the explicit DFT builds at once, this bounds its memory
+DFT_BLOCK_SIZE: int = 1 << 22
+# Samples read from a recording at a time by the streaming transform
+CHUNK_SAMPLES: int = 1 << 18
+
+
+def finish_amplitudes(a: NDArray[np.float64], b: NDArray[np.float64]
+                      ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Round the amplitudes like the original dft and halve the frequency 0 terms"""
+    # Adding 0 turns -0.0 into 0.0
+    a_cos: NDArray[np.float64] = np.round(a, 8) + 0
+    b_sin: NDArray[np.float64] = np.round(b, 8) + 0
+    # The very first cos term (the average value) is not multiplied by 2
+    a_cos[:1] /= 2
+    b_sin[:1] /= 2
+    return a_cos, b_sin
+
+
+def is_uniform(ts: NDArray[np.float64]) -> bool:
+    """Returns True if the time stamps are evenly spaced by 2 pi / ts.size"""
+    # The FFT frequencies are whole numbers only when the samples cover exactly one
+    # period of 2 pi, which is what the integer terms of the dft assume
+    if ts.size < 2:
+        return True
+    return bool(np.allclose(np.diff(ts), 2 * np.pi / ts.size, rtol=1e-9, atol=1e-12))
+
+
+def dft_fft(ts: NDArray[np.float64], ys: NDArray[np.float64]
+            ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Compute the dft of evenly spaced samples with np.fft.rfft"""
+    num_samples: int = ts.size
+    num_terms: int = num_samples // 2  # Nyquist limit
+    # rfft sums y * exp(-i term 2 pi sample / N), so a = 2/N Re F and b = -2/N Im F.
+    # A first time stamp other than 0 shifts the phase of every term.
+    transform: NDArray[np.complex128] = np.fft.rfft(ys)[:num_terms]
+    if ts.size and ts[0] != 0:
+        transform *= np.exp(-1j * np.arange(num_terms) * ts[0])
+    scale: float = 2 / num_samples
+    return finish_amplitudes(scale * transform.real, -scale * transform.imag)
+
+
+def dft_sums(ts: NDArray[np.float64], ys: NDArray[np.float64], num_terms: int
+             ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Returns the sums of cos(term t) y and sin(term t) y for term = 0 .. num_terms - 1"""
+    a: NDArray[np.float64] = np.zeros(num_terms)
+    b: NDArray[np.float64] = np.zeros(num_terms)
+    terms: NDArray[np.float64] = np.arange(num_terms, dtype=np.float64)
+    # Take the samples a block at a time so the cos/sin matrices stay small
+    block: int = max(1, DFT_BLOCK_SIZE // max(num_terms, 1))
+    for start in range(0, ts.size, block):
+        # One row of term * time stamp per term, one column per sample in this block
+        phases: NDArray[np.float64] = np.outer(terms, ts[start : start + block])
+        a += np.cos(phases) @ ys[start : start + block]
+        b += np.sin(phases) @ ys[start : start + block]
+    return a, b
+
+
+def dft_direct(ts: NDArray[np.float64], ys: NDArray[np.float64]
+               ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Compute the dft of samples at any time stamps"""
+    num_samples: int = ts.size
+    num_terms: int = num_samples // 2  # Nyquist limit
+    a, b = dft_sums(ts, ys, num_terms)
+    scale: float = 2 / num_samples
+    return finish_amplitudes(scale * a, scale * b)
+
+
+def dft(ts: NDArray[np.float64], ys: NDArray[np.float64]
+        ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """Compute the dft, returning the cos and sin amplitudes for each whole number frequency"""
+    ts = np.asarray(ts, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+    if is_uniform(ts):
+        return dft_fft(ts, ys)
+    return dft_direct(ts, ys)
+
+
+# ---------------------------------------------------------------------------
+# Streaming short-time Fourier transform
+# ---------------------------------------------------------------------------
+# Long recordings are read a chunk at a time from a CSV file (one "t,y" sample
+# per line, like unknown_wave.csv) or from a binary file of float64 (t, y) pairs.
+# Fixed windows of samples, overlapping by a set fraction, are multiplied by a
+# Hann window and transformed with rfft. Each window's magnitudes go to a .npy
+# spectrogram on disk and only its top-k peaks stay in memory. The whole-record
+# sums for the nonzero frequency extraction in analyze are added up chunk by chunk.
+
+
+class STFTResult(typing.NamedTuple):
+    spectrogram_file: str  # .npy file of shape (windows, window_size // 2 + 1)
+    frequencies: NDArray[np.float64]  # angular frequency of each spectrogram column
+    times: NDArray[np.float64]  # time stamp at the start of each window
+    peak_frequencies: NDArray[np.float64]  # (windows, top_k), strongest first
+    peak_magnitudes: NDArray[np.float64]  # (windows, top_k)
+    a_cos: NDArray[np.float64]  # whole-record dft amplitudes up to max_freq
+    b_sin: NDArray[np.float64]
+    nonzero_frequencies: NDArray[np.int64]  # where b_sin != 0, as in analyze
+
+
+def csv_chunks(file_name: str, chunk_size: int = CHUNK_SAMPLES,
+               delimiter: str = ",") -> typing.Iterator[NDArray[np.float64]]:
+    """Yields (samples, 2) arrays of time stamps and values from a CSV file"""
+    with open(file_name) as file:
+        while lines := list(islice(file, chunk_size)):
+            yield np.loadtxt(lines, delimiter=delimiter, ndmin=2)[:, :2]
+
+
+def binary_chunks(file_name: str, chunk_size: int = CHUNK_SAMPLES
+                  ) -> typing.Iterator[NDArray[np.float64]]:
+    """Yields (samples, 2) arrays of time stamps and values from a binary file of float64 pairs"""
+    samples: NDArray[np.float64] = np.memmap(file_name, dtype=np.float64, mode="r").reshape(-1, 2)
+    for start in range(0, len(samples), chunk_size):
+        # Copy the chunk so only this part of the file is held in memory
+        yield np.array(samples[start : start + chunk_size])
+
+
+def count_samples(file_name: str, binary: bool) -> int:
+    """Returns the number of samples in a CSV or binary file without loading it"""
+    if binary:
+        return os.path.getsize(file_name) // (2 * np.dtype(np.float64).itemsize)
+    num_lines: int = 0
+    last: bytes = b"\n"
+    with open(file_name, "rb") as file:
+        while block := file.read(1 << 24):
+            num_lines += block.count(b"\n")
+            last = block[-1:]
+    # The last line may not end with a newline
+    return num_lines + (last != b"\n")
+
+
+def stft(file_name: str, spectrogram_file: str, window_size: int = 1024,
+         overlap: float = 0.5, top_k: int = 4, max_freq: int = 40,
+         chunk_size: int = CHUNK_SAMPLES) -> STFTResult:
+    """Streams the short-time Fourier transform of a recording into spectrogram_file"""
+    binary: bool = not file_name.endswith(".csv")
+    hop: int = max(1, int(round(window_size * (1 - overlap))))
+    num_samples: int = count_samples(file_name, binary)
+    num_windows: int = 0 if num_samples < window_size else (num_samples - window_size) // hop + 1
+    num_bins: int = window_size // 2 + 1
+    top_k = min(top_k, num_bins - 1)
+
+    spectrogram: np.memmap = np.lib.format.open_memmap(
+        spectrogram_file, mode="w+", dtype=np.float32, shape=(num_windows, num_bins))
+    times: NDArray[np.float64] = np.zeros(num_windows)
+    peak_bins: NDArray[np.int64] = np.zeros((num_windows, top_k), dtype=np.int64)
+    peak_magnitudes: NDArray[np.float64] = np.zeros((num_windows, top_k))
+    hann: NDArray[np.float64] = np.hanning(window_size)
+    # Scale so a sine of amplitude A peaks at about A
+    scale: float = 2 / hann.sum()
+    a: NDArray[np.float64] = np.zeros(max_freq)
+    b: NDArray[np.float64] = np.zeros(max_freq)
+
+    # Samples carried over from the last chunk for windows that span two chunks
+    buffer: NDArray[np.float64] = np.zeros((0, 2))
+    window: int = 0
+    dt: float = 0.0
+    chunks: typing.Iterator[NDArray[np.float64]] = (
+        binary_chunks(file_name, chunk_size) if binary else csv_chunks(file_name, chunk_size))
+    for chunk in chunks:
+        sum_a, sum_b = dft_sums(chunk[:, 0], chunk[:, 1], max_freq)
+        a += sum_a
+        b += sum_b
+        if not dt and len(chunk) > 1:
+            dt = float(np.median(np.diff(chunk[:, 0])))
+        buffer = np.concatenate((buffer, chunk))
+        if len(buffer) < window_size:
+            continue
+        # Every window that fits in the buffer, as views into it
+        frames: NDArray[np.float64] = np.lib.stride_tricks.sliding_window_view(
+            buffer[:, 1], window_size)[::hop]
+        frames = frames[: num_windows - window]
+        magnitudes: NDArray[np.float64] = scale * np.abs(np.fft.rfft(frames * hann, axis=1))
+        rows: slice = slice(window, window + len(frames))
+        spectrogram[rows] = magnitudes
+        times[rows] = buffer[: len(frames) * hop : hop, 0]
+        # The top_k strongest nonzero frequencies, strongest first
+        strongest: NDArray[np.int64] = np.argpartition(
+            magnitudes[:, 1:], -top_k, axis=1)[:, -top_k:] + 1
+        order: NDArray[np.int64] = np.argsort(
+            -np.take_along_axis(magnitudes, strongest, axis=1), axis=1)
+        peak_bins[rows] = np.take_along_axis(strongest, order, axis=1)
+        peak_magnitudes[rows] = np.take_along_axis(magnitudes, peak_bins[rows], axis=1)
+        window += len(frames)
+        buffer = buffer[len(frames) * hop :]
+    spectrogram.flush()
+
+    # Column j of a window holds the angular frequency 2 pi j / (window_size dt)
+    frequencies: NDArray[np.float64] = np.zeros(num_bins)
+    if dt:
+        frequencies = 2 * np.pi * np.arange(num_bins, dtype=np.float64) / (window_size * dt)
+    a_cos, b_sin = finish_amplitudes(2 / max(num_samples, 1) * a, 2 / max(num_samples, 1) * b)
+    return STFTResult(spectrogram_file, frequencies, times, frequencies[peak_bins],
+                      peak_magnitudes, a_cos, b_sin, np.flatnonzero(b_sin))
+
+
+def reference_dft(ts: NDArray[np.float64], ys: NDArray[np.float64]
+                  ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """The original double loop dft from unknown_wave.ipynb, kept to check the fast versions"""
+    num_samples: int = ts.size
+    num_terms: int = int(num_samples / 2)  # Nyquist limit
+    a_cos: NDArray[np.float64] = np.zeros(num_terms)
+    b_sin: NDArray[np.float64] = np.zeros(num_terms)
+    for term in range(0, num_terms):
+        a: float = 0.0
+        b: float = 0.0
+        for sample in range(0, num_samples):
+            a += 2 * np.cos(term * ts[sample]) * ys[sample]
+            b += 2 * np.sin(term * ts[sample]) * ys[sample]
+        a_cos[term] = round(a / num_samples, 8) + 0
+        b_sin[term] = round(b / num_samples, 8) + 0
+    a_cos[0] /= 2
+    b_sin[0] /= 2
+    return a_cos, b_sin
+
+
+def main() -> None:
+    """Check the FFT and explicit DFT against the original loop"""
+    num_samples: int = 400
+    # The unknown wave y(t) = 2 sin(10 t) cos(3 t) = sin(7 t) + sin(13 t), plus an offset
+    ts: NDArray[np.float64] = np.linspace(0, 2 * np.pi, num_samples, endpoint=False)
+    ys: NDArray[np.float64] = 0.5 + 2 * np.sin(10 * ts) * np.cos(3 * ts)
+    expected: tuple[NDArray[np.float64], NDArray[np.float64]] = reference_dft(ts, ys)
+    for name, result in (("fft", dft_fft(ts, ys)), ("direct", dft_direct(ts, ys))):
+        matches: bool = all(np.allclose(x, y, rtol=0, atol=2e-8) for x, y in zip(result, expected))
+        print(f"{name:>6} dft matches the original loop: {matches}")
+    print(f"Nonzero sine frequencies: {np.flatnonzero(dft(ts, ys)[1])}")
+
+    # Unevenly spaced samples take the explicit DFT
+    rng: np.random.Generator = np.random.default_rng(7)
+    ts = np.sort(rng.uniform(0, 2 * np.pi, num_samples))
+    ys = np.sin(7 * ts) + np.sin(13 * ts)
+    expected = reference_dft(ts, ys)
+    matches = all(np.allclose(x, y, rtol=0, atol=2e-8) for x, y in zip(dft(ts, ys), expected))
+    print(f"uneven dft matches the original loop: {matches}")
+
+    # Stream a long recording of the unknown wave from disk, as binary and as CSV.
+    # It covers 100 periods, so each window is long enough to tell 7 and 13 apart.
+    num_samples = 2_000_000
+    ts = np.linspace(0, 200 * np.pi, num_samples, endpoint=False)
+    ys = 2 * np.sin(10 * ts) * np.cos(3 * ts)
+    with tempfile.TemporaryDirectory() as folder:
+        binary_file: str = os.path.join(folder, "unknown_wave.bin")
+        csv_file: str = os.path.join(folder, "unknown_wave.csv")
+        np.column_stack((ts, ys)).tofile(binary_file)
+        # Every 10th sample for the (much slower to read) CSV file
+        np.savetxt(csv_file, np.column_stack((ts, ys))[::10], delimiter=",")
+        for file_name, window_size in ((binary_file, 1 << 16), (csv_file, 1 << 13)):
+            stft_result: STFTResult = stft(file_name, os.path.join(folder, "spectrogram.npy"),
+                                           window_size=window_size, top_k=2)
+            shape: tuple[int, ...] = np.load(stft_result.spectrogram_file, mmap_mode="r").shape
+            print(f"\n{os.path.basename(file_name)}: {shape} spectrogram, "
+                  f"nonzero frequencies {stft_result.nonzero_frequencies}")
+            print(f"  strongest peaks in the first window: {np.round(stft_result.peak_frequencies[0], 2)}"
+                  f" with magnitudes {np.round(stft_result.peak_magnitudes[0], 2)}")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@
 #  by both 7 and 11. Code is modified from that given by  Dr. David Biersach
 #  in perfect_numbers.py.
 
+# Import the inclusion-exclusion sum of multiples from series.py
+from series import sum_of_multiples
+
 
 def is_divisible_by_7(i: int) -> bool:
     """Determine if i is divisible by 7"""
@@ -20,14 +23,13 @@ def is_divisible_by_11(i: int) -> bool:
 
 def main() -> None:
     """Summation of numbers divisible by 7 and 11 between 1 and 1900"""
-    # Initializing sum_divisible as an integer, first equal to 0
-    sum_divisible: int = 0
-    # Loop runs over a sequence of numbers for 1 to 1900 in increments of 1
-    for n in range(1, 1901, 1):
-        # Checks if the number is divisible by 7 and 11
-        if is_divisible_by_7(n) and is_divisible_by_11(n):
-            # Adds the number to sum_divisible
-            sum_divisible += n
+    # Numbers divisible by both 7 and 11 are the multiples of lcm(7, 11) = 77, so
+    #  the sum is 77 * (1 + 2 + ... + 1900 // 77)
+    sum_divisible: int = sum_of_multiples(1900, (7, 11), mode="all")
+    # Cross-check the closed form against the original brute-force loop
+    brute_force: int = sum(n for n in range(1, 1901)
+                           if is_divisible_by_7(n) and is_divisible_by_11(n))
+    assert sum_divisible == brute_force, "closed form disagrees with the loop"
     # Prints sum_divisible with commas
     print(f"Sum of numbers divisible by 7 and 11 = {sum_divisible:,}")
 
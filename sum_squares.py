@@ -5,6 +5,9 @@
 #   that of the Gaussian summation. Code is modified from that given by
 #   Dr. David Biersach in basel_series.py and perfect_numbers.py.
 
+# Import the closed form (Faulhaber) power sum from series.py
+from series import power_sum
+
 
 def sigma(n: int) -> float:
     """Summation for the squares of a given range of numbers defined later on"""
@@ -22,11 +25,12 @@ def sigma(n: int) -> float:
 
 
 def main() -> None:  # Defining the entry point for the program.
-    # Loop runs over a sequence of numbers for 1 to 1000 in increments of 1
-    for num_terms in range(0, 1001, 1):
-        # Variable series_sum is defined as a float type, set equal to the sigma,
-        #   will run for num_terms.
-        series_sum: float = sigma(num_terms)
+    # Only the last sum is printed, so compute it once with the exact closed form
+    #   instead of running sigma for every num_terms from 0 to 1000.
+    num_terms: int = 1000
+    series_sum: float = float(power_sum(num_terms, 2))
+    # Cross-check the closed form against the sigma loop
+    assert series_sum == sigma(num_terms), "closed form disagrees with sigma"
     # Prints the solution of sigma with commas as thousands separators.
     print(f"Sum of first 1000 natural numbers squared {series_sum: ,}")
 